@@ -11,5 +11,12 @@ This package provides functionality to:
 
 __version__ = '0.2.0'
 
-from .database import Database
 from .settings import settings
+
+def __getattr__(name):
+    # Database pulls in SQLAlchemy; resolve the re-export lazily so CLI
+    # commands that never touch the database don't pay the import cost.
+    if name == "Database":
+        from .database import Database
+        return Database
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,22 +2,13 @@
 import argparse
 import os
 import sys
-import time
-import json
-import asyncio
 from datetime import datetime
-from tqdm import tqdm
-from .browser_auth import BrowserAuth, interactive_login, check_auth_status
-from .booth_downloader import (
-    BoothDownloader, 
-    get_purchased_items, 
-    get_download_links, 
-    download_file,
-    download_all_files
-)
-from .database import Database
 from .settings import settings
 
+# Playwright, SQLAlchemy, and friends are heavy; they are imported inside
+# the command branches that need them so `--help`, `logout`, and `status`
+# don't pay the full startup cost.
+
 def auth_cli():
     """Command-line interface for Booth authentication and downloads."""
     parser = argparse.ArgumentParser(
@@ -49,6 +40,8 @@ def auth_cli():
     args = parser.parse_args()
     
     if args.command == "login":
+        from .browser_auth import interactive_login
+
         print("Launching browser for Booth login...")
         if interactive_login():
             print("Authentication successful!")
@@ -74,6 +67,8 @@ def auth_cli():
         settings.save()
     
     elif args.command == "status":
+        from .browser_auth import check_auth_status
+
         print("Checking authentication status...")
         if check_auth_status():
             print("✅ You are authenticated with Booth.")
@@ -89,6 +84,10 @@ def auth_cli():
             return 1
     
     elif args.command == "purchases":
+        from .browser_auth import check_auth_status
+        from .booth_downloader import get_purchased_items
+        from .database import Database
+
         print("Checking authentication status...")
         if not check_auth_status():
             print("Not authenticated. Please run 'booth-auth login' first.")
@@ -116,39 +115,32 @@ def auth_cli():
             if args.update_db:
                 print("\nUpdating database with purchased items...")
                 db = Database()
-                
-                for item in purchases:
-                    # Check if item exists in database
-                    existing_item = db.get_item(item['item_id'])
-                    
-                    if existing_item:
-                        # Update existing item
-                        db.update_item(
-                            item['item_id'],
-                            is_purchased=True,
-                            purchase_date=item.get('purchase_date'),
-                            purchase_price=item.get('price')
-                        )
-                        print(f"Updated item in database: {item['title']}")
-                    else:
-                        # Add new item
-                        db.add_item(
-                            item_id=item['item_id'],
-                            title=item['title'],
-                            url=item['url'],
-                            is_purchased=True,
-                            purchase_date=item.get('purchase_date'),
-                            purchase_price=item.get('price')
-                        )
-                        print(f"Added new item to database: {item['title']}")
-                
-                print("Database update complete.")
+
+                # One bulk upsert instead of a query/insert/update per item
+                count = db.upsert_items_bulk([
+                    {
+                        'item_id': item['item_id'],
+                        'title': item['title'],
+                        'url': item['url'],
+                        'purchase_date': item.get('purchase_date'),
+                        'purchase_price': item.get('price')
+                    }
+                    for item in purchases
+                ])
+
+                print(f"Database update complete ({count} items).")
             
         except Exception as e:
             print(f"Error fetching purchases: {e}")
             return 1
     
     elif args.command == "download":
+        import asyncio
+
+        from .browser_auth import check_auth_status
+        from .booth_downloader import run_downloads
+        from .database import Database
+
         print("Checking authentication status...")
         if not check_auth_status():
             print("Not authenticated. Please run 'booth-auth login' first.")
@@ -159,87 +151,79 @@ def auth_cli():
             settings.set("download_directory", args.output_dir)
             settings.save()
             print(f"Download directory set to: {args.output_dir}")
-        
+
+        # One Database instance (and one connection) for the whole command
+        db = Database()
+
         # Download specific item
         if args.item_id:
             try:
-                # Get item details
-                purchases = get_purchased_items()
-                item = next((p for p in purchases if p['item_id'] == args.item_id), None)
-                
-                if not item:
+                # Fetch purchases and download on one event loop and
+                # one shared downloader
+                purchases, results_by_item = asyncio.run(run_downloads(
+                    item_ids=[args.item_id],
+                    max_concurrent=args.concurrent,
+                    db=db
+                ))
+
+                if not purchases:
                     print(f"Item ID {args.item_id} not found in your purchases.")
                     return 1
-                
-                print(f"Downloading files for: {item['title']} (ID: {item['item_id']})")
-                
-                # Download all files for the item
-                results = download_all_files(
-                    item['item_id'], 
-                    item['title'],
-                    max_concurrent=args.concurrent
-                )
-                
+
+                item = purchases[0]
+                results = results_by_item.get(item['item_id'], [])
+
                 if not results:
                     print("No files were downloaded.")
                     return 1
-                
-                # Update database
-                db = Database()
-                for result in results:
-                    if result['success'] and result['path']:
-                        # Add download to database
-                        db.add_or_update_download(
-                            item_id=item['item_id'],
-                            filename=result['filename'],
-                            local_path=result['path'],
-                            download_date=datetime.now().isoformat()
-                        )
-                
+
+                # Record all download results with one bulk upsert
+                db.upsert_downloads_bulk([
+                    {
+                        'item_id': item['item_id'],
+                        'filename': result['filename'],
+                        'local_path': result['path'],
+                        'download_date': datetime.now()
+                    }
+                    for result in results
+                    if result['success'] and result['path']
+                ])
+
                 print("Download complete and database updated.")
-                
+
             except Exception as e:
                 print(f"Error downloading item: {e}")
                 return 1
-        
+
         # Download all items
         elif args.all:
             try:
-                # Get all purchases
-                purchases = get_purchased_items()
-                
+                # Fetch purchases and download everything on one event
+                # loop and one shared downloader
+                purchases, results_by_item = asyncio.run(run_downloads(
+                    max_concurrent=args.concurrent,
+                    db=db
+                ))
+
                 if not purchases:
                     print("No purchases found.")
                     return 0
-                
-                print(f"Downloading files for {len(purchases)} items...")
-                
-                # Download each item
-                for i, item in enumerate(purchases, 1):
-                    print(f"\n[{i}/{len(purchases)}] Processing: {item['title']} (ID: {item['item_id']})")
-                    
-                    # Download all files for the item
-                    results = download_all_files(
-                        item['item_id'], 
-                        item['title'],
-                        max_concurrent=args.concurrent
-                    )
-                    
-                    # Update database
-                    if results:
-                        db = Database()
-                        for result in results:
-                            if result['success'] and result['path']:
-                                # Add download to database
-                                db.add_or_update_download(
-                                    item_id=item['item_id'],
-                                    filename=result['filename'],
-                                    local_path=result['path'],
-                                    download_date=datetime.now().isoformat()
-                                )
-                
+
+                # Record every download result with one bulk upsert
+                db.upsert_downloads_bulk([
+                    {
+                        'item_id': item['item_id'],
+                        'filename': result['filename'],
+                        'local_path': result['path'],
+                        'download_date': datetime.now()
+                    }
+                    for item in purchases
+                    for result in results_by_item.get(item['item_id'], [])
+                    if result['success'] and result['path']
+                ])
+
                 print("\nAll downloads complete.")
-                
+
             except Exception as e:
                 print(f"Error downloading items: {e}")
                 return 1
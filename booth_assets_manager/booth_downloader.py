@@ -2,327 +2,617 @@ import os
 import re
 import json
 import asyncio
+import hashlib
 import urllib.parse
 from datetime import datetime
+import aiohttp
+from yarl import URL
+from bs4 import BeautifulSoup
 from tqdm import tqdm
 from playwright.async_api import async_playwright
 from .settings import settings
 
+# Read/write chunk size for streamed downloads
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+
+# How many orders pages to fetch at once when the listing is paginated
+ORDERS_PAGE_CONCURRENCY = 4
+
+# Connection pool size for the shared HTTP session
+HTTP_CONNECTION_LIMIT = 8
+
+# Re-runs within this window skip the link scrape when every file the
+# database knows about is already on disk
+DOWNLOAD_RECHECK_SECONDS = 24 * 60 * 60
+
+# Patterns applied once per scraped row; compiled up front
+_ITEM_ID_RE = re.compile(r'/(?:en/)?items/(\d+)')
+_PAGE_PARAM_RE = re.compile(r'[?&]page=(\d+)')
+
+class PageCache:
+    """
+    Conditional-GET cache for scraped Booth pages.
+
+    Remembers the ETag/Last-Modified headers a page was served with and
+    keeps the body on disk, so a later fetch can send If-None-Match /
+    If-Modified-Since and reuse the cached HTML on a 304 instead of
+    re-downloading and re-rendering the page.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.index = {}
+
+    def _body_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + ".html")
+
+    def conditional_headers(self, url):
+        """Headers to send so the server can answer 304 Not Modified."""
+        entry = self.index.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, url):
+        """Return the cached body for a URL, or None if missing."""
+        try:
+            with open(self._body_path(url), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url, html, etag=None, last_modified=None):
+        """Cache a page body along with its validators."""
+        if not etag and not last_modified:
+            # Nothing to revalidate against later
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._body_path(url), 'w', encoding='utf-8') as f:
+            f.write(html)
+        self.index[url] = {'etag': etag, 'last_modified': last_modified}
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+
+def _parse_orders_html(html):
+    """Extract purchased items from the orders page HTML."""
+    purchases = []
+    soup = BeautifulSoup(html, 'html.parser')
+    for item in soup.select('.orders-item'):
+        link_el = item.select_one('.orders-item-title a')
+        if not link_el:
+            continue
+
+        title = link_el.get_text()
+        url = urllib.parse.urljoin('https://booth.pm', link_el.get('href', ''))
+
+        # Extract item ID from URL
+        match = _ITEM_ID_RE.search(url)
+        if not match:
+            continue
+
+        date_el = item.select_one('.orders-item-date')
+        price_el = item.select_one('.orders-item-price')
+
+        purchases.append({
+            'item_id': match.group(1),
+            'title': title.strip(),
+            'url': url,
+            'purchase_date': date_el.get_text().strip() if date_el else None,
+            'price': price_el.get_text().strip() if price_el else None
+        })
+    return purchases
+
+def _find_last_page(html):
+    """Return the highest page number linked from the orders pager."""
+    last = 1
+    soup = BeautifulSoup(html, 'html.parser')
+    for link in soup.select('.pagination a'):
+        match = _PAGE_PARAM_RE.search(link.get('href', ''))
+        if match:
+            last = max(last, int(match.group(1)))
+    return last
+
+def _parse_download_links_html(html):
+    """Extract download links from an item's downloads page HTML."""
+    download_links = []
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup.select('.download-item'):
+        name_el = element.select_one('.file-name')
+        if not name_el:
+            continue
+
+        link_el = element.select_one('.download-link')
+        if not link_el:
+            continue
+
+        href = link_el.get('href')
+        if not href:
+            continue
+
+        size_el = element.select_one('.file-size')
+
+        download_links.append({
+            'filename': name_el.get_text().strip(),
+            'size': size_el.get_text().strip() if size_el else None,
+            'url': urllib.parse.urljoin('https://booth.pm', href)
+        })
+    return download_links
+
 class BoothDownloader:
     """
-    Handles downloading files from Booth using browser automation.
+    Handles downloading files from Booth.
+
+    File downloads are plain cookie-authenticated HTTPS requests streamed
+    to disk through a shared aiohttp session; Playwright is only used for
+    the pages that need a rendered browser (orders and download-link
+    scraping). One instance owns the session, the browser, and a
+    cookie-loaded context for its whole lifetime — use as an async context
+    manager so they are created once per batch instead of once per file.
     """
     def __init__(self):
         self.cookies_path = settings.get("auth_cookies_file")
         self.download_base_dir = settings.get("download_directory", "BoothDownloads")
         os.makedirs(self.download_base_dir, exist_ok=True)
-    
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._cookies = None
+        self._cookies_mtime = 0
+        self._http = None
+        self._prepared_folders = set()
+        self._page_cache = PageCache(
+            os.path.join(os.path.dirname(settings.config_path), "page_cache")
+        )
+
+    async def __aenter__(self):
+        await self._start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _get_cookies(self):
+        """Return the parsed cookies, re-reading the file only when it changed."""
+        if not self.cookies_path or not os.path.exists(self.cookies_path):
+            raise Exception("Not authenticated. Please login first.")
+
+        mtime = os.stat(self.cookies_path).st_mtime
+        if self._cookies is None or mtime != self._cookies_mtime:
+            with open(self.cookies_path, 'r', encoding='utf-8') as f:
+                self._cookies = json.load(f)
+            self._cookies_mtime = mtime
+        return self._cookies
+
+    async def _start(self):
+        """Load cookies and create the shared HTTP session."""
+        if self._http is not None:
+            return
+
+        self._cookies = self._get_cookies()
+
+        jar = aiohttp.CookieJar()
+        for cookie in self._cookies:
+            domain = cookie.get('domain', 'booth.pm').lstrip('.')
+            jar.update_cookies(
+                {cookie['name']: cookie['value']},
+                response_url=URL(f"https://{domain}/")
+            )
+
+        # Pool and keep connections alive so downloads reuse TLS sessions
+        # instead of handshaking per file
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_CONNECTION_LIMIT,
+            limit_per_host=HTTP_CONNECTION_LIMIT,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        self._http = aiohttp.ClientSession(
+            connector=connector,
+            cookie_jar=jar,
+            headers={'Accept-Encoding': 'gzip, deflate'}
+        )
+
+    async def _ensure_browser(self):
+        """Launch the browser and create the shared cookie-loaded context."""
+        await self._start()
+        if self._context is not None:
+            return
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._context = await self._browser.new_context(
+            java_script_enabled=True,
+            viewport={'width': 1280, 'height': 720}
+        )
+        self._context.set_default_timeout(120000)  # 2 minutes timeout
+        await self._context.add_cookies(self._cookies)
+
+    async def close(self):
+        """Shut down the shared browser, Playwright driver, and HTTP session."""
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+            self._context = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    @staticmethod
+    def _has_file(path):
+        """True if path exists with nonzero size (blocking; call via to_thread)."""
+        return os.path.exists(path) and os.path.getsize(path) > 0
+
+    # Spaces become underscores, filesystem-hostile characters are dropped
+    _SANITIZE_TABLE = str.maketrans({' ': '_', **{ch: None for ch in '\\/*?:"<>|'}})
+
     def sanitize_filename(self, filename):
         """Sanitize a string to be used as a safe filename."""
-        return re.sub(r'[\\/*?:"<>|]', "", filename.replace(" ", "_"))
-    
-    async def get_purchased_items(self):
+        return filename.translate(self._SANITIZE_TABLE)
+
+    async def _fetch_page_html(self, url):
         """
-        Fetch list of purchased items from Booth.
-        Returns a list of dictionaries with item details.
+        Fetch a page over plain HTTP with conditional-GET caching.
+        Returns the HTML, or None when the page needs the browser instead
+        (redirect to login, non-200 response, network error).
         """
-        if not self.cookies_path or not os.path.exists(self.cookies_path):
-            raise Exception("Not authenticated. Please login first.")
-        
-        purchases = []
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
-            
-            # Load cookies
-            with open(self.cookies_path, 'r', encoding='utf-8') as f:
-                cookies = json.load(f)
-            
-            await context.add_cookies(cookies)
-            page = await context.new_page()
-            
-            # Go to orders page
-            await page.goto('https://booth.pm/orders')
-            
-            # Check if we're redirected to login
+        await self._start()
+
+        headers = self._page_cache.conditional_headers(url)
+        try:
+            async with self._http.get(url, headers=headers) as response:
+                if response.status == 304:
+                    # Unchanged since we last saw it — reuse the cached body
+                    return self._page_cache.load(url)
+                if response.status != 200 or '/users/sign_in' in str(response.url):
+                    return None
+                html = await response.text()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except aiohttp.ClientError:
+            return None
+
+        self._page_cache.store(url, html, etag, last_modified)
+        return html
+
+    async def _open_authenticated_page(self, url):
+        """
+        Navigate a new page on the shared context to a URL that needs a
+        live session. Raises if Booth bounces us to the login page; the
+        caller owns closing the returned page.
+        """
+        await self._ensure_browser()
+        page = await self._context.new_page()
+        try:
+            await page.goto(url)
             if '/users/sign_in' in page.url:
-                await browser.close()
                 raise Exception("Session expired. Please login again.")
-            
+        except Exception:
+            await page.close()
+            raise
+        return page
+
+    async def _scrape_orders_page(self, url):
+        """
+        Render one orders page in the shared browser context.
+        Returns (purchases, page_html).
+        """
+        page = await self._open_authenticated_page(url)
+        try:
             # Wait for orders to load
             await page.wait_for_selector('.orders-item', timeout=10000)
-            
-            # Extract order items
-            order_items = await page.query_selector_all('.orders-item')
-            
-            for item in order_items:
-                # Extract title and URL
-                title_el = await item.query_selector('.orders-item-title')
-                if title_el:
-                    link_el = await title_el.query_selector('a')
-                    if link_el:
-                        title = await link_el.text_content()
-                        url = await link_el.get_attribute('href')
-                        url = urllib.parse.urljoin('https://booth.pm', url)
-                        
-                        # Extract item ID from URL
-                        match = re.search(r'/(?:en/)?items/(\d+)', url)
-                        item_id = match.group(1) if match else None
-                        
-                        if item_id:
-                            # Extract additional details like purchase date, price
-                            date_el = await item.query_selector('.orders-item-date')
-                            purchase_date = await date_el.text_content() if date_el else None
-                            
-                            price_el = await item.query_selector('.orders-item-price')
-                            price_text = await price_el.text_content() if price_el else None
-                            
-                            purchases.append({
-                                'item_id': item_id,
-                                'title': title.strip(),
-                                'url': url,
-                                'purchase_date': purchase_date.strip() if purchase_date else None,
-                                'price': price_text.strip() if price_text else None
-                            })
-            
-            await browser.close()
-        
+
+            # Grab the rendered HTML once and parse it locally instead of
+            # issuing a protocol round-trip per element
+            html = await page.content()
+            return _parse_orders_html(html), html
+        finally:
+            await page.close()
+
+    async def get_purchased_items(self):
+        """
+        Fetch list of purchased items from Booth, following pagination.
+        Pages after the first are fetched concurrently. Returns a list of
+        dictionaries with item details.
+        """
+        # Cheap path first: conditional GET plus local parsing
+        html = await self._fetch_page_html('https://booth.pm/orders')
+        if html is not None:
+            purchases = _parse_orders_html(html)
+            if purchases:
+                last_page = _find_last_page(html)
+                if last_page > 1:
+                    semaphore = asyncio.Semaphore(ORDERS_PAGE_CONCURRENCY)
+
+                    async def fetch_page(number):
+                        async with semaphore:
+                            page_html = await self._fetch_page_html(
+                                f'https://booth.pm/orders?page={number}'
+                            )
+                            return _parse_orders_html(page_html) if page_html else []
+
+                    tasks = [fetch_page(n) for n in range(2, last_page + 1)]
+                    for page_purchases in await asyncio.gather(*tasks):
+                        purchases.extend(page_purchases)
+                return purchases
+
+        # Fall back to rendered pages
+        purchases, first_page_html = await self._scrape_orders_page('https://booth.pm/orders')
+
+        last_page = _find_last_page(first_page_html)
+        if last_page > 1:
+            semaphore = asyncio.Semaphore(ORDERS_PAGE_CONCURRENCY)
+
+            async def scrape_page(number):
+                async with semaphore:
+                    page_purchases, _ = await self._scrape_orders_page(
+                        f'https://booth.pm/orders?page={number}'
+                    )
+                    return page_purchases
+
+            tasks = [scrape_page(n) for n in range(2, last_page + 1)]
+            for page_purchases in await asyncio.gather(*tasks):
+                purchases.extend(page_purchases)
+
         return purchases
-    
+
     async def get_download_links(self, item_id):
         """
         Get download links for a purchased item.
         Returns a list of dictionaries with file details.
         """
-        if not self.cookies_path or not os.path.exists(self.cookies_path):
-            raise Exception("Not authenticated. Please login first.")
-        
-        download_links = []
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
-            
-            # Load cookies
-            with open(self.cookies_path, 'r', encoding='utf-8') as f:
-                cookies = json.load(f)
-            
-            await context.add_cookies(cookies)
-            page = await context.new_page()
-            
-            # Go to item's download page
-            await page.goto(f'https://booth.pm/items/{item_id}/downloads')
-            
-            # Check if we're redirected to login
-            if '/users/sign_in' in page.url:
-                await browser.close()
-                raise Exception("Session expired. Please login again.")
-            
-            # Check if we have access to download this item
-            error_el = await page.query_selector('.l-alerts')
-            if error_el:
-                error_text = await error_el.text_content()
-                if "not purchased" in error_text.lower():
-                    await browser.close()
-                    raise Exception(f"You have not purchased item {item_id}")
-            
-            # Wait for download links to load
+        # Cheap path first: conditional GET plus local parsing
+        html = await self._fetch_page_html(f'https://booth.pm/items/{item_id}/downloads')
+        if html is not None:
+            download_links = _parse_download_links_html(html)
+            if download_links:
+                return download_links
+
+        # Fall back to a rendered page
+        page = await self._open_authenticated_page(f'https://booth.pm/items/{item_id}/downloads')
+        try:
+            # Wait for download links (or an error alert) to load, then
+            # parse the rendered HTML locally instead of issuing a protocol
+            # round-trip per element
             await page.wait_for_selector('.download-link, .l-alerts', timeout=10000)
-            
-            # Extract download links
-            download_elements = await page.query_selector_all('.download-item')
-            
-            for element in download_elements:
-                # Get filename
-                name_el = await element.query_selector('.file-name')
-                if not name_el:
-                    continue
-                
-                filename = await name_el.text_content()
-                filename = filename.strip()
-                
-                # Get file size
-                size_el = await element.query_selector('.file-size')
-                file_size = await size_el.text_content() if size_el else None
-                
-                # Get download link
-                link_el = await element.query_selector('.download-link')
-                if not link_el:
-                    continue
-                
-                href = await link_el.get_attribute('href')
-                if not href:
-                    continue
-                
-                download_url = urllib.parse.urljoin('https://booth.pm', href)
-                
-                download_links.append({
-                    'filename': filename,
-                    'size': file_size.strip() if file_size else None,
-                    'url': download_url
-                })
-            
-            await browser.close()
-        
-        return download_links
-    
-    async def download_file(self, download_url, item_id, item_title, filename):
+            html = await page.content()
+        finally:
+            await page.close()
+
+        # Check if we have access to download this item
+        soup = BeautifulSoup(html, 'html.parser')
+        error_el = soup.select_one('.l-alerts')
+        if error_el and "not purchased" in error_el.get_text().lower():
+            raise Exception(f"You have not purchased item {item_id}")
+
+        return _parse_download_links_html(html)
+
+    async def download_file(self, download_url, item_id, item_title, filename, position=None):
         """
-        Download a file using browser automation.
-        Returns the path to the downloaded file.
+        Download a file by streaming it over the shared HTTP session.
+        position places this file's progress bar below a shared overall
+        bar when several downloads render at once. Returns the path to
+        the downloaded file.
         """
-        if not self.cookies_path or not os.path.exists(self.cookies_path):
-            raise Exception("Not authenticated. Please login first.")
-        
-        # Create folder for the item
+        await self._start()
+
+        # Create folder for the item (once per folder, off the event loop)
         safe_title = self.sanitize_filename(item_title)
         item_folder = os.path.join(self.download_base_dir, f"{item_id}_{safe_title}")
         downloads_folder = os.path.join(item_folder, "downloads")
-        os.makedirs(downloads_folder, exist_ok=True)
-        
+        if downloads_folder not in self._prepared_folders:
+            await asyncio.to_thread(os.makedirs, downloads_folder, exist_ok=True)
+            self._prepared_folders.add(downloads_folder)
+
         # Generate file path
         file_path = os.path.join(downloads_folder, filename)
-        
+
         # Skip if file already exists and is not empty
-        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-            print(f"File already exists: {file_path}")
+        if await asyncio.to_thread(self._has_file, file_path):
+            tqdm.write(f"File already exists: {file_path}")
             return file_path
-        
-        print(f"Downloading {filename} to {file_path}...")
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            
-            # Set download path
-            context = await browser.new_context(
-                accept_downloads=True,
-                # Firefox settings for preventing file chooser dialog
-                java_script_enabled=True,
-                viewport={'width': 1280, 'height': 720}
-            )
-            
-            # Set download behavior to save all downloads
-            await context.set_default_timeout(120000)  # 2 minutes timeout
-            
-            # Load cookies
-            with open(self.cookies_path, 'r', encoding='utf-8') as f:
-                cookies = json.load(f)
-            
-            await context.add_cookies(cookies)
-            page = await context.new_page()
-            
-            # Create download listener
-            download_promise = page.wait_for_download()
-            
-            # Visit download URL
-            try:
-                await page.goto(download_url, wait_until='domcontentloaded')
-            except Exception as e:
-                print(f"Error navigating to download URL: {e}")
-                await browser.close()
-                return None
-            
-            # Check if redirected to login
-            if '/users/sign_in' in page.url:
-                await browser.close()
-                raise Exception("Session expired. Please login again.")
-            
-            # Wait for download to start
-            try:
-                download = await download_promise
-                
-                # Initialize progress bar
-                progress_bar = tqdm(total=100, desc=f"Downloading {filename}", unit="%")
-                
-                # Save the download to the specified path
-                await download.save_as(file_path)
-                
-                # Update progress bar to 100%
-                progress_bar.update(100 - progress_bar.n)
-                progress_bar.close()
-                
-                print(f"Download complete: {file_path}")
-                await browser.close()
-                return file_path
-                
-            except Exception as e:
-                print(f"Error downloading file: {e}")
-                await browser.close()
-                return None
+
+        tqdm.write(f"Downloading {filename} to {file_path}...")
+
+        try:
+            async with self._http.get(download_url, allow_redirects=True) as response:
+                # Check if redirected to login
+                if '/users/sign_in' in str(response.url):
+                    raise Exception("Session expired. Please login again.")
+
+                response.raise_for_status()
+
+                # Stream the body to disk in fixed-size chunks, reporting
+                # actual bytes received
+                total = int(response.headers.get('Content-Length', 0))
+                with open(file_path, 'wb') as f, tqdm(
+                    total=total or None, unit='B', unit_scale=True, desc=filename,
+                    position=position, leave=position is None
+                ) as pbar:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        pbar.update(len(chunk))
+
+            tqdm.write(f"Download complete: {file_path}")
+            return file_path
+
+        except Exception as e:
+            tqdm.write(f"Error downloading file: {e}")
+            # Don't leave a partial file behind to be mistaken for a success
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            return None
 
 # Helper functions to run async methods
 def get_purchased_items():
     """Get list of purchased items."""
-    downloader = BoothDownloader()
-    return asyncio.run(downloader.get_purchased_items())
+    async def run():
+        async with BoothDownloader() as downloader:
+            return await downloader.get_purchased_items()
+    return asyncio.run(run())
 
 def get_download_links(item_id):
     """Get download links for an item."""
-    downloader = BoothDownloader()
-    return asyncio.run(downloader.get_download_links(item_id))
+    async def run():
+        async with BoothDownloader() as downloader:
+            return await downloader.get_download_links(item_id)
+    return asyncio.run(run())
 
 def download_file(download_url, item_id, item_title, filename):
     """Download a file."""
-    downloader = BoothDownloader()
-    return asyncio.run(downloader.download_file(download_url, item_id, item_title, filename))
+    async def run():
+        async with BoothDownloader() as downloader:
+            return await downloader.download_file(download_url, item_id, item_title, filename)
+    return asyncio.run(run())
 
 # Advanced functionality for parallel downloads
-async def download_multiple_files(item_id, item_title, download_links, max_concurrent=3):
-    """Download multiple files concurrently with limited concurrency."""
-    downloader = BoothDownloader()
+async def _download_files(downloader, item_id, item_title, download_links, max_concurrent=3):
+    """Download a batch of files on a shared downloader with limited concurrency."""
     semaphore = asyncio.Semaphore(max_concurrent)
-    results = []
-    
-    async def download_with_limit(link):
+
+    # One overall bar at row 0; per-file bars cycle through the rows below
+    # it so at most max_concurrent bars render at a time
+    overall = tqdm(total=len(download_links), unit='file', desc=item_title, position=0)
+
+    async def download_with_limit(index, link):
         async with semaphore:  # Limit concurrent downloads
             result = await downloader.download_file(
-                link['url'], 
-                item_id, 
-                item_title, 
-                link['filename']
+                link['url'],
+                item_id,
+                item_title,
+                link['filename'],
+                position=(index % max_concurrent) + 1
             )
+            overall.update(1)
             return {
                 'filename': link['filename'],
                 'path': result,
                 'success': result is not None
             }
-    
-    # Create download tasks
-    tasks = [download_with_limit(link) for link in download_links]
-    
-    # Execute all tasks concurrently
-    results = await asyncio.gather(*tasks)
-    
+
+    tasks = [download_with_limit(i, link) for i, link in enumerate(download_links)]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        overall.close()
+
+async def download_multiple_files(item_id, item_title, download_links, max_concurrent=3):
+    """Download multiple files concurrently with limited concurrency."""
+    async with BoothDownloader() as downloader:
+        return await _download_files(downloader, item_id, item_title, download_links, max_concurrent)
+
+def _completed_downloads(db, item_id):
+    """Map filename -> download record for files that are still on disk."""
+    return {
+        d['filename']: d
+        for d in db.get_downloads(item_id)
+        if d['status'] == 'completed' and d['local_path']
+        and os.path.exists(d['local_path']) and os.path.getsize(d['local_path']) > 0
+    }
+
+async def _download_item_files(downloader, db, item_id, item_title, max_concurrent=3):
+    """Download all pending files for one item on a shared downloader.
+
+    Files the database already tracks (and that are still on disk) are
+    skipped, and a recently-checked item whose known files are all
+    present short-circuits before the link scrape.
+    """
+    completed = _completed_downloads(db, item_id)
+
+    # Everything we know about is on disk and the item was checked
+    # recently: answer from the database without touching the network
+    if completed:
+        item = db.get_item(item_id)
+        last_check = item.get('last_download_check') if item else None
+        if last_check:
+            age = datetime.utcnow() - datetime.fromisoformat(last_check)
+            if age.total_seconds() < DOWNLOAD_RECHECK_SECONDS:
+                print(f"All {len(completed)} known files for {item_title} are already downloaded.")
+                return [
+                    {'filename': name, 'path': d['local_path'], 'success': True}
+                    for name, d in completed.items()
+                ]
+
+    # Get download links
+    links = await downloader.get_download_links(item_id)
+
+    if not links:
+        print(f"No download links found for item {item_id}")
+        return []
+
+    # Only dispatch files that aren't already on disk
+    pending = [link for link in links if link['filename'] not in completed]
+    results = [
+        {'filename': link['filename'], 'path': completed[link['filename']]['local_path'], 'success': True}
+        for link in links if link['filename'] in completed
+    ]
+
+    if pending:
+        results = results + await _download_files(
+            downloader, item_id, item_title, pending, max_concurrent
+        )
+
+    # Print summary
+    successful = [r for r in results if r['success']]
+    print(f"\nDownload summary for {item_title}:")
+    print(f"  Total files: {len(results)}")
+    print(f"  Already present: {len(results) - len(pending)}")
+    print(f"  Successfully downloaded: {len(successful)}")
+    print(f"  Failed: {len(results) - len(successful)}")
+
     return results
 
-def download_all_files(item_id, item_title, max_concurrent=3):
-    """Download all files for an item with concurrency control."""
+async def run_downloads(item_ids=None, max_concurrent=3, db=None):
+    """
+    Fetch purchases and download their files on a single event loop.
+
+    One downloader (HTTP session plus browser) serves the whole run
+    instead of one per helper call. item_ids limits the run to those
+    items; None downloads everything. Pass db to reuse an existing
+    Database instance. Returns (purchases, results_by_item_id).
+    """
+    from .database import Database
+
+    if db is None:
+        db = Database()
+    results_by_item = {}
+    async with BoothDownloader() as downloader:
+        purchases = await downloader.get_purchased_items()
+        if item_ids is not None:
+            wanted = set(item_ids)
+            purchases = [p for p in purchases if p['item_id'] in wanted]
+
+        for i, item in enumerate(purchases, 1):
+            print(f"\n[{i}/{len(purchases)}] Processing: {item['title']} (ID: {item['item_id']})")
+            results_by_item[item['item_id']] = await _download_item_files(
+                downloader, db, item['item_id'], item['title'], max_concurrent
+            )
+
+    return purchases, results_by_item
+
+def download_all_files(item_id, item_title, max_concurrent=3, db=None):
+    """Download all files for a single item (opens its own event loop)."""
+    from .database import Database
+
+    if db is None:
+        db = Database()
+
+    async def run():
+        async with BoothDownloader() as downloader:
+            return await _download_item_files(downloader, db, item_id, item_title, max_concurrent)
+
     try:
-        # Get download links
-        links = get_download_links(item_id)
-        
-        if not links:
-            print(f"No download links found for item {item_id}")
-            return []
-        
-        # Download all files concurrently
-        results = asyncio.run(download_multiple_files(
-            item_id, 
-            item_title, 
-            links, 
-            max_concurrent
-        ))
-        
-        # Print summary
-        successful = [r for r in results if r['success']]
-        print(f"\nDownload summary for {item_title}:")
-        print(f"  Total files: {len(results)}")
-        print(f"  Successfully downloaded: {len(successful)}")
-        print(f"  Failed: {len(results) - len(successful)}")
-        
-        return results
-        
+        return asyncio.run(run())
     except Exception as e:
         print(f"Error downloading files for item {item_id}: {e}")
         return []
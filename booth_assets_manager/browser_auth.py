@@ -2,7 +2,7 @@ import os
 import json
 import asyncio
 from datetime import datetime
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from .settings import settings
 
 class BrowserAuth:
@@ -13,6 +13,17 @@ class BrowserAuth:
     def __init__(self):
         self.cookies_path = os.path.join(os.path.dirname(settings.config_path), "booth_cookies.json")
         self.auth_timeout = 300  # 5 minutes to log in
+        self._cookies = None
+        self._cookies_mtime = 0
+
+    def _load_cookies(self):
+        """Return the parsed cookies, re-reading the file only when it changed."""
+        mtime = os.stat(self.cookies_path).st_mtime
+        if self._cookies is None or mtime != self._cookies_mtime:
+            with open(self.cookies_path, 'r', encoding='utf-8') as f:
+                self._cookies = json.load(f)
+            self._cookies_mtime = mtime
+        return self._cookies
     
     async def interactive_login(self):
         """
@@ -33,32 +44,23 @@ class BrowserAuth:
             print("This window will close automatically after successful login.")
             print("You have 5 minutes to complete the login process.\n")
             
-            # Wait for login to complete by checking either:
-            # 1. Navigation to dashboard after login
+            # Wait for login to complete by watching for:
+            # 1. Navigation away from the sign-in/sign-up pages
             # 2. Presence of user-specific elements
-            
+
             try:
-                # Wait for either login success or timeout
-                login_success = False
-                
-                for _ in range(self.auth_timeout):
-                    # Check if we're on a page that indicates successful login
-                    current_url = page.url
-                    if "/users/sign_in" not in current_url and "/sign_up" not in current_url:
-                        # Additional check - look for user account elements
-                        user_menu = await page.query_selector(".user-dropdown-menu")
-                        if user_menu:
-                            login_success = True
-                            break
-                    
-                    # Wait a second before checking again
-                    await asyncio.sleep(1)
-                
-                if not login_success:
+                timeout_ms = self.auth_timeout * 1000
+                try:
+                    await page.wait_for_url(
+                        lambda url: "/users/sign_in" not in url and "/sign_up" not in url,
+                        timeout=timeout_ms
+                    )
+                    await page.wait_for_selector(".user-dropdown-menu", timeout=timeout_ms)
+                except PlaywrightTimeoutError:
                     print("Login timed out or was unsuccessful.")
                     await browser.close()
                     return False
-                
+
                 # Successfully logged in, get cookies
                 cookies = await context.cookies()
                 
@@ -87,10 +89,8 @@ class BrowserAuth:
             return False
         
         try:
-            # Load cookies
-            with open(self.cookies_path, 'r', encoding='utf-8') as f:
-                cookies = json.load(f)
-            
+            cookies = self._load_cookies()
+
             # Check for required Booth cookies
             booth_cookies = [c for c in cookies if 'booth.pm' in c.get('domain', '')]
             session_cookies = [c for c in booth_cookies if c.get('name') == '_plaza_session']
@@ -113,12 +113,8 @@ class BrowserAuth:
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
                 context = await browser.new_context()
-                
-                # Load cookies
-                with open(self.cookies_path, 'r', encoding='utf-8') as f:
-                    cookies = json.load(f)
-                
-                await context.add_cookies(cookies)
+
+                await context.add_cookies(self._load_cookies())
                 page = await context.new_page()
                 
                 # Visit account settings - redirects to login if not authenticated
@@ -1,20 +1,74 @@
+from contextlib import contextmanager
 from datetime import datetime
-from sqlalchemy import create_engine, Column, String, Text, Integer, DateTime, ForeignKey, Boolean
+from sqlalchemy import bindparam, create_engine, delete, event, func, lambda_stmt, or_, select, text, Column, String, Text, Integer, DateTime, ForeignKey, Boolean, Index, UniqueConstraint
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, scoped_session
+import json
 import os
 
+# Folder-name sanitizing: spaces become underscores, filesystem-hostile
+# characters are dropped — one C-level pass instead of replace + regex
+_SANITIZE_TABLE = str.maketrans({' ': '_', **{ch: None for ch in '\\/*?:"<>|'}})
+
 # Get the directory where the package is installed
 PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATABASE_PATH = os.path.join(PACKAGE_DIR, 'booth.db')
 
 # Create engine and configure base
-engine = create_engine(f'sqlite:///{DATABASE_PATH}')
+engine = create_engine(f'sqlite:///{DATABASE_PATH}', insertmanyvalues_page_size=1000)
 Base = declarative_base()
 
+# page_size can only be chosen before the database is created (WAL locks
+# it in), so remember whether this run starts from scratch
+_FRESH_DATABASE = not os.path.exists(DATABASE_PATH)
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """Tune SQLite for bulk writes: WAL journaling and fewer fsyncs."""
+    cursor = dbapi_conn.cursor()
+    if _FRESH_DATABASE:
+        cursor.execute("PRAGMA page_size=4096")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB memory-mapped reads
+    cursor.execute("PRAGMA busy_timeout=60000")  # wait out concurrent writers
+    cursor.close()
+
+# Thread-local session registry shared by every Database instance, so the
+# many small read/write methods reuse one session instead of constructing
+# and discarding one per call
+# expire_on_commit=False: results are converted to plain dicts before
+# they're returned, so there's no need to re-SELECT attributes after commit
+SessionFactory = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+
+# Refresh query-planner statistics now and then instead of never
+_OPTIMIZE_EVERY = 64
+_connection_closes = 0
+
+@event.listens_for(engine, "close")
+def _run_pragma_optimize(dbapi_conn, connection_record):
+    global _connection_closes
+    _connection_closes += 1
+    if _connection_closes % _OPTIMIZE_EVERY == 0:
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA optimize")
+        cursor.close()
+
 class Item(Base):
     __tablename__ = 'items'
-    
+    __table_args__ = (
+        # Partial indexes for the flag filters used by the listing queries
+        Index('ix_items_purchased', 'is_purchased', sqlite_where=text('is_purchased = 1')),
+        Index('ix_items_packaged', 'is_packaged', sqlite_where=text('is_packaged = 1')),
+        # String PK with lookups by that key: WITHOUT ROWID stores rows in
+        # the PK b-tree directly, skipping the rowid indirection (new
+        # databases only; existing files keep their layout)
+        {'sqlite_with_rowid': False},
+    )
+
     item_id = Column(String, primary_key=True)
     title = Column(Text, nullable=False)
     url = Column(Text, nullable=False)
@@ -28,6 +82,9 @@ class Item(Base):
     is_packaged = Column(Boolean, default=False)
     package_version = Column(String)
     last_packaged = Column(DateTime)
+    # Full package.json blob, so the repository index can be rebuilt
+    # without re-reading every manifest from disk
+    manifest_json = Column(Text)
     
     # Purchase information
     is_purchased = Column(Boolean, default=False)
@@ -43,7 +100,7 @@ class Image(Base):
     __tablename__ = 'images'
     
     id = Column(Integer, primary_key=True)
-    item_id = Column(String, ForeignKey('items.item_id', ondelete='CASCADE'))
+    item_id = Column(String, ForeignKey('items.item_id', ondelete='CASCADE'), index=True)
     url = Column(Text, nullable=False)
     local_path = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -53,15 +110,19 @@ class Image(Base):
 
 class Download(Base):
     __tablename__ = 'downloads'
-    
+    __table_args__ = (
+        # One record per file per item; also backs the ON CONFLICT upsert
+        UniqueConstraint('item_id', 'filename', name='uq_download_item_filename'),
+    )
+
     id = Column(Integer, primary_key=True)
-    item_id = Column(String, ForeignKey('items.item_id', ondelete='CASCADE'))
+    item_id = Column(String, ForeignKey('items.item_id', ondelete='CASCADE'), index=True)
     filename = Column(Text, nullable=False)
     url = Column(Text)
     local_path = Column(Text, nullable=False)
     file_size = Column(Integer)
     checksum = Column(Text)
-    download_date = Column(Text)
+    download_date = Column(DateTime)
     last_attempt = Column(DateTime, default=datetime.utcnow)
     status = Column(Text, default="completed")
     download_count = Column(Integer, default=1)
@@ -69,345 +130,782 @@ class Download(Base):
     # Relationship to item
     item = relationship("Item", back_populates="downloads")
 
+# One column list shared by every item read API, so the public dict shape
+# lives in a single place (_item_dict)
+_ITEM_COLUMNS = (
+    Item.item_id, Item.title, Item.url, Item.description, Item.folder_path,
+    Item.package_id, Item.is_packaged, Item.package_version,
+    Item.last_packaged, Item.is_purchased, Item.purchase_date,
+    Item.purchase_price, Item.last_download_check,
+)
+
+# Hot statements built once; lambda_stmt caches the constructed statement
+# so per-call Python construction and compilation overhead disappears
+_ITEM_ROW_BY_ID = lambda_stmt(
+    lambda: select(*_ITEM_COLUMNS).where(Item.item_id == bindparam('iid'))
+)
+
+# Schema setup already ran this process; skip the sqlite_master scans on
+# later Database() constructions
+_SCHEMA_READY = False
+
 class Database:
     def __init__(self):
+        global _SCHEMA_READY
+        if not _SCHEMA_READY:
+            self._ensure_schema()
+            _SCHEMA_READY = True
+        # Shared session registry (module level so instances don't each
+        # pay session setup)
+        self.Session = SessionFactory
+        # Session shared by all operations inside an open transaction() block
+        self._session = None
+
+    def _ensure_schema(self):
         # Create tables if they don't exist
         Base.metadata.create_all(engine)
-        # Create session factory
-        self.Session = sessionmaker(bind=engine)
-    
-    def add_item(self, item_id: str, title: str, url: str, description: str = None, folder_path: str = None, 
-                 images: list = None, package_id: str = None, is_packaged: bool = False, 
-                 package_version: str = None, is_purchased: bool = False, purchase_date: str = None, 
-                 purchase_price: str = None):
-        """Add or update an item and its images in the database."""
+        # Databases created before these indexes existed won't get them
+        # from create_all (existing tables are skipped), so add them here
+        with engine.connect() as conn:
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_download_item_filename "
+                "ON downloads (item_id, filename)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_images_item_id ON images (item_id)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_downloads_item_id ON downloads (item_id)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_items_purchased "
+                "ON items (is_purchased) WHERE is_purchased = 1"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_items_packaged "
+                "ON items (is_packaged) WHERE is_packaged = 1"
+            ))
+            # Databases created before manifest storage lack the column;
+            # create_all skips existing tables, so add it here
+            item_columns = {row[1] for row in conn.execute(text("PRAGMA table_info(items)"))}
+            if "manifest_json" not in item_columns:
+                conn.execute(text("ALTER TABLE items ADD COLUMN manifest_json TEXT"))
+            # download_date used to be stored as isoformat() text with a
+            # 'T' separator, which the DateTime column can't parse back
+            conn.execute(text(
+                "UPDATE downloads SET download_date = REPLACE(download_date, 'T', ' ') "
+                "WHERE download_date LIKE '%T%'"
+            ))
+            # Refresh planner statistics so the indexes actually get picked
+            conn.execute(text("ANALYZE"))
+            conn.commit()
+
+    def close(self):
+        """Release the thread-local session at a logical boundary."""
+        self.Session.remove()
+
+    @contextmanager
+    def transaction(self):
+        """Group multiple write operations into a single transaction.
+
+        All Database calls made inside the block share one session and are
+        committed (or rolled back) together, so bulk imports and download
+        loops flush to disk once instead of once per row.
+        """
+        if self._session is not None:
+            # Already inside a transaction; participate in the outer one
+            yield
+            return
+
         session = self.Session()
+        self._session = session
         try:
-            # Check if item exists
-            item = session.query(Item).filter_by(item_id=item_id).first()
-            if not item:
-                item = Item(
-                    item_id=item_id,
-                    title=title,
-                    url=url,
-                    description=description,
-                    folder_path=folder_path or f"BoothItems/{item_id}_{self._sanitize_title(title)}",
-                    package_id=package_id,
-                    is_packaged=is_packaged,
-                    package_version=package_version,
-                    is_purchased=is_purchased,
-                    purchase_date=purchase_date,
-                    purchase_price=purchase_price
-                )
-                session.add(item)
-            else:
-                # Update existing item
+            yield
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self._session = None
+            session.close()
+
+    def _get_session(self):
+        """Return (session, owned). Owned sessions are committed and closed
+        by the calling method; shared ones belong to an open transaction()."""
+        if self._session is not None:
+            return self._session, False
+        return self.Session(), True
+
+    def _upsert_item(self, session, item_id: str, title: str, url: str, description: str = None,
+                     folder_path: str = None, images: list = None, package_id: str = None,
+                     is_packaged: bool = False, package_version: str = None, is_purchased: bool = False,
+                     purchase_date: str = None, purchase_price: str = None):
+        """Insert or update one item (and its images) on an existing session.
+
+        Returns True when image rows were written through Core statements
+        (changes the session's change tracking can't see).
+        """
+        images_changed = False
+        # PK lookup: identity-map hit when already loaded, no query compilation
+        item = session.get(Item, item_id)
+        if not item:
+            item = Item(
+                item_id=item_id,
+                title=title,
+                url=url,
+                description=description,
+                folder_path=folder_path or f"BoothItems/{item_id}_{self._sanitize_title(title)}",
+                package_id=package_id,
+                is_packaged=is_packaged,
+                package_version=package_version,
+                is_purchased=is_purchased,
+                purchase_date=purchase_date,
+                purchase_price=purchase_price
+            )
+            session.add(item)
+        else:
+            # Update the existing item, but only touch fields that actually
+            # changed so unchanged re-imports don't emit UPDATEs
+            if item.title != title:
                 item.title = title
+            if item.url != url:
                 item.url = url
-                if description is not None:
-                    item.description = description
-                if folder_path is not None:
-                    item.folder_path = folder_path
-                
-                # Update package info if provided
-                if package_id is not None:
+            if description is not None and item.description != description:
+                item.description = description
+            if folder_path is not None and item.folder_path != folder_path:
+                item.folder_path = folder_path
+
+            # Update package info if provided
+            if package_id is not None:
+                if item.package_id != package_id:
                     item.package_id = package_id
+                if item.is_packaged != is_packaged:
                     item.is_packaged = is_packaged
+                if item.package_version != package_version:
                     item.package_version = package_version
-                
-                # Update purchase info if provided
-                if is_purchased:
+
+            # Update purchase info if provided
+            if is_purchased:
+                if item.is_purchased != is_purchased:
                     item.is_purchased = is_purchased
-                    if purchase_date is not None:
-                        item.purchase_date = purchase_date
-                    if purchase_price is not None:
-                        item.purchase_price = purchase_price
-            
-            # Add images if provided
-            if images:
-                # Clear existing images
-                session.query(Image).filter_by(item_id=item_id).delete()
-                
-                # Add new images
-                for img_url, local_path in images:
-                    image = Image(
-                        item_id=item_id,
-                        url=img_url,
-                        local_path=local_path
-                    )
-                    session.add(image)
-            
-            session.commit()
+                if purchase_date is not None and item.purchase_date != purchase_date:
+                    item.purchase_date = purchase_date
+                if purchase_price is not None and item.purchase_price != purchase_price:
+                    item.purchase_price = purchase_price
+
+        # Sync images if provided: write only the difference against what's
+        # stored, so an unchanged re-scrape writes nothing
+        if images:
+            existing = {
+                url: (img_id, local_path)
+                for url, img_id, local_path in session.execute(
+                    select(Image.url, Image.id, Image.local_path)
+                    .where(Image.item_id == item_id)
+                )
+            }
+            new_urls = {url for url, _ in images}
+
+            to_remove = [img_id for url, (img_id, _) in existing.items() if url not in new_urls]
+            to_add = [
+                {'item_id': item_id, 'url': url, 'local_path': local_path}
+                for url, local_path in images if url not in existing
+            ]
+            to_update = [
+                {'img_id': existing[url][0], 'new_path': local_path}
+                for url, local_path in images
+                if url in existing and existing[url][1] != local_path
+            ]
+
+            if to_remove:
+                session.execute(
+                    delete(Image).where(Image.id.in_(to_remove)),
+                    execution_options={'synchronize_session': False}
+                )
+            if to_add:
+                # Core insert so insertmanyvalues packs multi-row INSERTs
+                session.execute(Image.__table__.insert(), to_add)
+            if to_update:
+                session.execute(
+                    Image.__table__.update()
+                    .where(Image.__table__.c.id == bindparam('img_id'))
+                    .values(local_path=bindparam('new_path')),
+                    to_update
+                )
+            images_changed = bool(to_remove or to_add or to_update)
+
+        return images_changed
+
+    def add_item(self, item_id: str, title: str, url: str, description: str = None, folder_path: str = None,
+                 images: list = None, package_id: str = None, is_packaged: bool = False,
+                 package_version: str = None, is_purchased: bool = False, purchase_date: str = None,
+                 purchase_price: str = None):
+        """Add or update an item and its images in the database."""
+        session, owned = self._get_session()
+        try:
+            images_changed = self._upsert_item(
+                session, item_id, title, url,
+                description=description,
+                folder_path=folder_path,
+                images=images,
+                package_id=package_id,
+                is_packaged=is_packaged,
+                package_version=package_version,
+                is_purchased=is_purchased,
+                purchase_date=purchase_date,
+                purchase_price=purchase_price
+            )
+            if owned:
+                # Nothing changed: don't pay for a commit
+                if images_changed or session.dirty or session.new or session.deleted:
+                    session.commit()
+            else:
+                session.flush()
             return True
         except Exception as e:
-            session.rollback()
+            if owned:
+                session.rollback()
             raise e
         finally:
-            session.close()
-    
+            if owned:
+                session.close()
+
+    # How many rows to upsert between commits in add_items_bulk
+    BULK_COMMIT_EVERY = 10000
+
+    # How many item rows to fetch per batch in iter_all_items
+    ITER_BATCH_SIZE = 500
+
+    def add_items_bulk(self, items):
+        """Add or update many items with one commit instead of one per item.
+
+        items is an iterable of dicts accepted by add_item (so images and
+        package fields are supported, unlike the column-only
+        upsert_items_bulk). Commits every BULK_COMMIT_EVERY rows to bound
+        memory on huge imports. Returns the number of items written.
+        """
+        session, owned = self._get_session()
+        try:
+            count = 0
+            for item in items:
+                self._upsert_item(session, **item)
+                count += 1
+                if owned and count % self.BULK_COMMIT_EVERY == 0:
+                    session.commit()
+            if owned:
+                session.commit()
+            else:
+                session.flush()
+            return count
+        except Exception as e:
+            if owned:
+                session.rollback()
+            raise e
+        finally:
+            if owned:
+                session.close()
+
     def update_item(self, item_id: str, **kwargs):
         """Update specific fields of an item."""
-        session = self.Session()
+        session, owned = self._get_session()
         try:
-            item = session.query(Item).filter_by(item_id=item_id).first()
+            item = session.get(Item, item_id)
             if not item:
                 return False
-            
-            # Update provided fields
+
+            # Update provided fields, skipping values that didn't change
             for key, value in kwargs.items():
-                if hasattr(item, key):
+                if hasattr(item, key) and getattr(item, key) != value:
                     setattr(item, key, value)
-            
-            session.commit()
+
+            if owned:
+                # Nothing changed: don't pay for a commit
+                if session.dirty or session.new or session.deleted:
+                    session.commit()
+            else:
+                session.flush()
             return True
         except Exception as e:
-            session.rollback()
+            if owned:
+                session.rollback()
             raise e
         finally:
-            session.close()
-    
+            if owned:
+                session.close()
+
+    def upsert_items_bulk(self, rows):
+        """Upsert many purchased items in a single statement.
+
+        Each row is a dict with item_id, title, url and optionally
+        folder_path / purchase_date / purchase_price. One
+        INSERT ... ON CONFLICT DO UPDATE bound to all rows replaces the
+        per-row query / insert-or-update round-trips. Returns the number
+        of rows written.
+        """
+        if not rows:
+            return 0
+
+        now = datetime.utcnow()
+        values = [
+            {
+                'item_id': row['item_id'],
+                'title': row['title'],
+                'url': row['url'],
+                'folder_path': row.get('folder_path')
+                    or f"BoothItems/{row['item_id']}_{self._sanitize_title(row['title'])}",
+                'is_purchased': True,
+                'purchase_date': row.get('purchase_date'),
+                'purchase_price': row.get('purchase_price'),
+                'created_at': now,
+                'updated_at': now,
+            }
+            for row in rows
+        ]
+
+        table = Item.__table__
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['item_id'],
+            set_={
+                'title': stmt.excluded.title,
+                'url': stmt.excluded.url,
+                'is_purchased': True,
+                # Don't wipe existing values with scraped blanks
+                'purchase_date': func.coalesce(stmt.excluded.purchase_date, table.c.purchase_date),
+                'purchase_price': func.coalesce(stmt.excluded.purchase_price, table.c.purchase_price),
+                'updated_at': stmt.excluded.updated_at,
+            },
+            # Skip the row rewrite entirely when a re-fetch carries no
+            # actual change (is_distinct_from is null-safe)
+            where=or_(
+                table.c.title.is_distinct_from(stmt.excluded.title),
+                table.c.url.is_distinct_from(stmt.excluded.url),
+                table.c.is_purchased == False,
+                table.c.purchase_date.is_distinct_from(
+                    func.coalesce(stmt.excluded.purchase_date, table.c.purchase_date)),
+                table.c.purchase_price.is_distinct_from(
+                    func.coalesce(stmt.excluded.purchase_price, table.c.purchase_price)),
+            )
+        )
+
+        session, owned = self._get_session()
+        try:
+            session.execute(stmt, values)
+            if owned:
+                session.commit()
+            else:
+                session.flush()
+            return len(values)
+        except Exception as e:
+            if owned:
+                session.rollback()
+            raise e
+        finally:
+            if owned:
+                session.close()
+
     def remove_item(self, item_id: str):
         """Remove an item and its images from the database."""
-        session = self.Session()
+        session, owned = self._get_session()
         try:
-            item = session.query(Item).filter_by(item_id=item_id).first()
+            item = session.get(Item, item_id)
             if item:
                 session.delete(item)  # This will cascade delete related images and downloads
-                session.commit()
+                if owned:
+                    session.commit()
+                else:
+                    session.flush()
                 return True
             return False
         except Exception as e:
-            session.rollback()
+            if owned:
+                session.rollback()
             raise e
         finally:
-            session.close()
-    
-    def update_package_info(self, item_id: str, package_id: str, package_version: str, is_packaged: bool = True):
+            if owned:
+                session.close()
+
+    def update_package_info(self, item_id: str, package_id: str, package_version: str, is_packaged: bool = True, manifest: dict = None):
         """Update package information for an item."""
-        session = self.Session()
+        session, owned = self._get_session()
         try:
-            item = session.query(Item).filter_by(item_id=item_id).first()
-            if item:
-                item.package_id = package_id
-                item.is_packaged = is_packaged
-                item.package_version = package_version
-                item.last_packaged = datetime.utcnow()
+            # One UPDATE instead of SELECT-then-UPDATE
+            updated = session.query(Item).filter_by(item_id=item_id).update(
+                {
+                    Item.package_id: package_id,
+                    Item.is_packaged: is_packaged,
+                    Item.package_version: package_version,
+                    Item.last_packaged: datetime.utcnow(),
+                    Item.manifest_json: json.dumps(manifest, ensure_ascii=False) if manifest else None,
+                },
+                synchronize_session=False
+            )
+            if owned:
                 session.commit()
-                return True
-            return False
+            else:
+                session.flush()
+            return updated > 0
         except Exception as e:
-            session.rollback()
+            if owned:
+                session.rollback()
             raise e
         finally:
-            session.close()
+            if owned:
+                session.close()
     
-    def add_or_update_download(self, item_id: str, filename: str, local_path: str, 
-                              url: str = None, file_size: int = None, checksum: str = None, 
-                              download_date: str = None, status: str = "completed"):
+    def add_or_update_download(self, item_id: str, filename: str, local_path: str,
+                              url: str = None, file_size: int = None, checksum: str = None,
+                              download_date: datetime = None, status: str = "completed"):
         """Add or update a download record."""
-        session = self.Session()
+        session, owned = self._get_session()
         try:
-            # Check if download exists
-            download = session.query(Download).filter_by(
-                item_id=item_id, 
-                filename=filename
-            ).first()
-            
-            if not download:
-                # Create new download record
-                download = Download(
-                    item_id=item_id,
-                    filename=filename,
-                    url=url,
-                    local_path=local_path,
-                    file_size=file_size,
-                    checksum=checksum,
-                    download_date=download_date,
-                    status=status,
-                    download_count=1,
-                    last_attempt=datetime.utcnow()
-                )
-                session.add(download)
+            now = datetime.utcnow()
+            table = Download.__table__
+
+            # Single native upsert instead of SELECT-then-INSERT/UPDATE
+            stmt = sqlite_insert(table).values(
+                item_id=item_id,
+                filename=filename,
+                url=url,
+                local_path=local_path,
+                file_size=file_size,
+                checksum=checksum,
+                download_date=download_date,
+                status=status,
+                download_count=1,
+                last_attempt=now
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['item_id', 'filename'],
+                set_={
+                    'local_path': stmt.excluded.local_path,
+                    # Keep existing values when the caller didn't supply one
+                    'url': func.coalesce(stmt.excluded.url, table.c.url),
+                    'file_size': func.coalesce(stmt.excluded.file_size, table.c.file_size),
+                    'checksum': func.coalesce(stmt.excluded.checksum, table.c.checksum),
+                    'download_date': func.coalesce(stmt.excluded.download_date, table.c.download_date),
+                    'status': stmt.excluded.status,
+                    'download_count': table.c.download_count + 1,
+                    'last_attempt': stmt.excluded.last_attempt,
+                }
+            )
+            session.execute(stmt)
+
+            # Update item's last_download_check with one UPDATE
+            session.query(Item).filter_by(item_id=item_id).update(
+                {Item.last_download_check: now}, synchronize_session=False
+            )
+
+            if owned:
+                session.commit()
             else:
-                # Update existing download
-                download.local_path = local_path
-                if url is not None:
-                    download.url = url
-                if file_size is not None:
-                    download.file_size = file_size
-                if checksum is not None:
-                    download.checksum = checksum
-                if download_date is not None:
-                    download.download_date = download_date
-                download.status = status
-                download.download_count += 1
-                download.last_attempt = datetime.utcnow()
-            
-            # Update item's last_download_check
-            item = session.query(Item).filter_by(item_id=item_id).first()
-            if item:
-                item.last_download_check = datetime.utcnow()
-            
-            session.commit()
+                session.flush()
             return True
         except Exception as e:
-            session.rollback()
+            if owned:
+                session.rollback()
             raise e
         finally:
-            session.close()
-    
+            if owned:
+                session.close()
+
+    def upsert_downloads_bulk(self, rows):
+        """Upsert many download records in a single statement.
+
+        Each row is a dict with item_id, filename, local_path and
+        optionally url / file_size / checksum / download_date / status.
+        One INSERT ... ON CONFLICT DO UPDATE bound to all rows handles
+        inserts, updates, and the download_count increment atomically in
+        SQL, and last_download_check is touched once per item. Returns
+        the number of rows written.
+        """
+        if not rows:
+            return 0
+
+        now = datetime.utcnow()
+        values = [
+            {
+                'item_id': row['item_id'],
+                'filename': row['filename'],
+                'url': row.get('url'),
+                'local_path': row['local_path'],
+                'file_size': row.get('file_size'),
+                'checksum': row.get('checksum'),
+                'download_date': row.get('download_date'),
+                'status': row.get('status', 'completed'),
+                'download_count': 1,
+                'last_attempt': now,
+            }
+            for row in rows
+        ]
+
+        table = Download.__table__
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['item_id', 'filename'],
+            set_={
+                'local_path': stmt.excluded.local_path,
+                # Keep existing values when the caller didn't supply one
+                'url': func.coalesce(stmt.excluded.url, table.c.url),
+                'file_size': func.coalesce(stmt.excluded.file_size, table.c.file_size),
+                'checksum': func.coalesce(stmt.excluded.checksum, table.c.checksum),
+                'download_date': func.coalesce(stmt.excluded.download_date, table.c.download_date),
+                'status': stmt.excluded.status,
+                'download_count': table.c.download_count + 1,
+                'last_attempt': stmt.excluded.last_attempt,
+            }
+        )
+
+        session, owned = self._get_session()
+        try:
+            session.execute(stmt, values)
+
+            # One bulk touch of last_download_check instead of one per row
+            session.query(Item).filter(Item.item_id.in_({row['item_id'] for row in rows})).update(
+                {Item.last_download_check: now}, synchronize_session=False
+            )
+
+            if owned:
+                session.commit()
+            else:
+                session.flush()
+            return len(rows)
+        except Exception as e:
+            if owned:
+                session.rollback()
+            raise e
+        finally:
+            if owned:
+                session.close()
+
+    def get_dashboard_counts(self):
+        """Return (total_items, purchased, packaged, total_downloads) in one query.
+
+        One aggregate round-trip with FILTER clauses replaces fetching and
+        counting the full item lists in Python.
+        """
+        session, owned = self._get_session()
+        try:
+            row = session.execute(
+                select(
+                    func.count(Item.item_id),
+                    func.count(Item.item_id).filter(Item.is_purchased == True),
+                    func.count(Item.item_id).filter(Item.is_packaged == True),
+                    select(func.count(Download.id)).scalar_subquery()
+                )
+            ).one()
+            return tuple(row)
+        finally:
+            if owned:
+                session.close()
+
+    def get_download_count_per_item(self):
+        """Return {item_id: download count} from one indexed GROUP BY."""
+        session, owned = self._get_session()
+        try:
+            rows = session.execute(
+                select(Download.item_id, func.count(Download.id))
+                .group_by(Download.item_id)
+            ).all()
+            return dict(rows)
+        finally:
+            if owned:
+                session.close()
+
+    def _item_dict(self, row, images, downloads):
+        """Build the public item dict from a column row plus grouped children."""
+        item_id = row['item_id']
+        pairs = images.get(item_id, [])
+        return {
+            'item_id': item_id,
+            'title': row['title'],
+            'url': row['url'],
+            'description': row['description'],
+            'folder': row['folder_path'],
+            'images': [url for url, _ in pairs],
+            'local_images': [path for _, path in pairs],
+            'package_id': row['package_id'],
+            'is_packaged': row['is_packaged'],
+            'package_version': row['package_version'],
+            'last_packaged': row['last_packaged'].isoformat() if row['last_packaged'] else None,
+            'is_purchased': row['is_purchased'],
+            'purchase_date': row['purchase_date'],
+            'purchase_price': row['purchase_price'],
+            'last_download_check': row['last_download_check'].isoformat() if row['last_download_check'] else None,
+            'downloads': downloads.get(item_id, [])
+        }
+
+    def _images_by_item(self, session, item_ids):
+        """Group (url, local_path) image pairs for the given items (one query)."""
+        grouped = {}
+        rows = session.execute(
+            select(Image.item_id, Image.url, Image.local_path)
+            .where(Image.item_id.in_(item_ids))
+        ).all()
+        for item_id, url, local_path in rows:
+            grouped.setdefault(item_id, []).append((url, local_path))
+        return grouped
+
+    def _downloads_by_item(self, session, item_ids):
+        """Group download summary dicts for the given items (one query)."""
+        grouped = {}
+        rows = session.execute(
+            select(Download.item_id, Download.filename, Download.local_path,
+                   Download.download_date, Download.status)
+            .where(Download.item_id.in_(item_ids))
+        ).mappings().all()
+        for row in rows:
+            grouped.setdefault(row['item_id'], []).append({
+                'filename': row['filename'],
+                'local_path': row['local_path'],
+                'download_date': row['download_date'].isoformat() if row['download_date'] else None,
+                'status': row['status']
+            })
+        return grouped
+
     def get_downloads(self, item_id: str):
         """Get all downloads for an item."""
-        session = self.Session()
+        session, owned = self._get_session()
         try:
-            downloads = session.query(Download).filter_by(item_id=item_id).all()
+            # Plain column select: no ORM instances for a read-only dict
+            rows = session.execute(
+                select(
+                    Download.id, Download.filename, Download.url, Download.local_path,
+                    Download.file_size, Download.checksum, Download.download_date,
+                    Download.status, Download.download_count, Download.last_attempt
+                ).where(Download.item_id == item_id)
+            ).mappings().all()
             return [
                 {
-                    'id': download.id,
-                    'filename': download.filename,
-                    'url': download.url,
-                    'local_path': download.local_path,
-                    'file_size': download.file_size,
-                    'checksum': download.checksum,
-                    'download_date': download.download_date,
-                    'status': download.status,
-                    'download_count': download.download_count,
-                    'last_attempt': download.last_attempt.isoformat() if download.last_attempt else None
+                    'id': row['id'],
+                    'filename': row['filename'],
+                    'url': row['url'],
+                    'local_path': row['local_path'],
+                    'file_size': row['file_size'],
+                    'checksum': row['checksum'],
+                    'download_date': row['download_date'].isoformat() if row['download_date'] else None,
+                    'status': row['status'],
+                    'download_count': row['download_count'],
+                    'last_attempt': row['last_attempt'].isoformat() if row['last_attempt'] else None
                 }
-                for download in downloads
+                for row in rows
             ]
         finally:
-            session.close()
+            if owned:
+                session.close()
     
     def get_purchased_items(self):
         """Get all purchased items from the database."""
-        session = self.Session()
+        session, owned = self._get_session()
         try:
-            items = session.query(Item).filter_by(is_purchased=True).all()
-            return [
-                {
-                    'item_id': item.item_id,
-                    'title': item.title,
-                    'url': item.url,
-                    'description': item.description,
-                    'folder': item.folder_path,
-                    'purchase_date': item.purchase_date,
-                    'purchase_price': item.purchase_price,
-                    'last_download_check': item.last_download_check.isoformat() if item.last_download_check else None,
-                    'downloads': [
-                        {
-                            'filename': download.filename,
-                            'local_path': download.local_path,
-                            'download_date': download.download_date,
-                            'status': download.status
-                        }
-                        for download in item.downloads
-                    ]
-                }
-                for item in items
-            ]
+            rows = session.execute(
+                select(*_ITEM_COLUMNS).where(Item.is_purchased == True)
+            ).mappings().all()
+
+            item_ids = [row['item_id'] for row in rows]
+            images = self._images_by_item(session, item_ids)
+            downloads = self._downloads_by_item(session, item_ids)
+
+            return [self._item_dict(row, images, downloads) for row in rows]
         finally:
-            session.close()
+            if owned:
+                session.close()
     
     def get_item(self, item_id: str):
         """Get an item and its images from the database."""
-        session = self.Session()
+        session, owned = self._get_session()
         try:
-            item = session.query(Item).filter_by(item_id=item_id).first()
-            if not item:
+            row = session.execute(
+                _ITEM_ROW_BY_ID, {'iid': item_id}
+            ).mappings().first()
+            if not row:
                 return None
-            
-            # Convert to dictionary format matching current CSV structure
-            return {
-                'item_id': item.item_id,
-                'title': item.title,
-                'url': item.url,
-                'description': item.description,
-                'folder': item.folder_path,
-                'images': [img.url for img in item.images],
-                'local_images': [img.local_path for img in item.images],
-                'package_id': item.package_id,
-                'is_packaged': item.is_packaged,
-                'package_version': item.package_version,
-                'last_packaged': item.last_packaged.isoformat() if item.last_packaged else None,
-                'is_purchased': item.is_purchased,
-                'purchase_date': item.purchase_date,
-                'purchase_price': item.purchase_price,
-                'last_download_check': item.last_download_check.isoformat() if item.last_download_check else None,
-                'downloads': [
-                    {
-                        'filename': download.filename,
-                        'local_path': download.local_path,
-                        'download_date': download.download_date,
-                        'status': download.status
-                    }
-                    for download in item.downloads
-                ]
-            }
+
+            return self._item_dict(
+                row,
+                self._images_by_item(session, [item_id]),
+                self._downloads_by_item(session, [item_id])
+            )
         finally:
-            session.close()
+            if owned:
+                session.close()
     
-    def get_all_items(self):
-        """Get all items from the database."""
-        session = self.Session()
+    def iter_all_items(self):
+        """Yield every item dict lazily, streaming ITER_BATCH_SIZE rows at a time.
+
+        Memory stays bounded by the batch size instead of the catalog size,
+        so exports and bulk re-serialization can iterate without building
+        the whole list first. The session stays open until the generator is
+        exhausted (or closed).
+        """
+        session, owned = self._get_session()
         try:
-            items = session.query(Item).all()
-            return [
-                {
-                    'item_id': item.item_id,
-                    'title': item.title,
-                    'url': item.url,
-                    'description': item.description,
-                    'folder': item.folder_path,
-                    'images': [img.url for img in item.images],
-                    'local_images': [img.local_path for img in item.images],
-                    'package_id': item.package_id,
-                    'is_packaged': item.is_packaged,
-                    'package_version': item.package_version,
-                    'last_packaged': item.last_packaged.isoformat() if item.last_packaged else None,
-                    'is_purchased': item.is_purchased,
-                    'purchase_date': item.purchase_date,
-                    'purchase_price': item.purchase_price,
-                    'last_download_check': item.last_download_check.isoformat() if item.last_download_check else None,
-                    'downloads': [
-                        {
-                            'filename': download.filename,
-                            'local_path': download.local_path,
-                            'download_date': download.download_date,
-                            'status': download.status
-                        }
-                        for download in item.downloads
-                    ]
-                }
-                for item in items
-            ]
+            result = session.execute(
+                select(*_ITEM_COLUMNS).execution_options(yield_per=self.ITER_BATCH_SIZE)
+            ).mappings()
+
+            for rows in result.partitions():
+                # Grouped child queries per batch keep the query count at
+                # two per ITER_BATCH_SIZE items, not two per item
+                item_ids = [row['item_id'] for row in rows]
+                images = self._images_by_item(session, item_ids)
+                downloads = self._downloads_by_item(session, item_ids)
+
+                for row in rows:
+                    yield self._item_dict(row, images, downloads)
         finally:
-            session.close()
+            if owned:
+                session.close()
+
+    def get_all_items(self):
+        """Get all items from the database."""
+        return list(self.iter_all_items())
     
     def get_packaged_items(self):
         """Get all packaged items from the database."""
-        session = self.Session()
+        session, owned = self._get_session()
         try:
-            items = session.query(Item).filter_by(is_packaged=True).all()
-            return [
-                {
-                    'item_id': item.item_id,
-                    'title': item.title,
-                    'url': item.url,
-                    'description': item.description,
-                    'folder': item.folder_path,
-                    'images': [img.url for img in item.images],
-                    'local_images': [img.local_path for img in item.images],
-                    'package_id': item.package_id,
-                    'package_version': item.package_version,
-                    'last_packaged': item.last_packaged.isoformat() if item.last_packaged else None
-                }
-                for item in items
-            ]
+            rows = session.execute(
+                select(*_ITEM_COLUMNS).where(Item.is_packaged == True)
+            ).mappings().all()
+
+            item_ids = [row['item_id'] for row in rows]
+            images = self._images_by_item(session, item_ids)
+            downloads = self._downloads_by_item(session, item_ids)
+
+            return [self._item_dict(row, images, downloads) for row in rows]
         finally:
-            session.close()
-    
+            if owned:
+                session.close()
+
+    def count_packaged_items(self):
+        """Count packaged items without loading the rows."""
+        session, owned = self._get_session()
+        try:
+            return session.execute(
+                select(func.count(Item.item_id)).where(Item.is_packaged == True)
+            ).scalar_one()
+        finally:
+            if owned:
+                session.close()
+
+    def get_package_manifests(self):
+        """Get the stored package manifests for all packaged items.
+
+        Returns None when any packaged item predates manifest storage, so
+        callers can fall back to scanning the repository on disk.
+        """
+        session, owned = self._get_session()
+        try:
+            blobs = session.execute(
+                select(Item.manifest_json).where(Item.is_packaged == True)
+            ).scalars().all()
+            if any(blob is None for blob in blobs):
+                return None
+            return [json.loads(blob) for blob in blobs]
+        finally:
+            if owned:
+                session.close()
+
     def _sanitize_title(self, title: str):
         """Sanitize a title for use in folder names."""
-        import re
-        return re.sub(r'[\\/*?:"<>|]', "", title.replace(" ", "_"))
+        return title.translate(_SANITIZE_TABLE)
@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 import argparse
 import csv
+import functools
 import json
 import os
 import re
 import requests
+import shutil
+import threading
 import sys
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .database import Database
 from .settings import settings
 from .vcc_integration import package_item, generate_repository_index
@@ -14,13 +20,73 @@ from .vcc_integration import package_item, generate_repository_index
 # Global constants
 BASE_DIR = "BoothItems"
 
+# Compiled once at import; both patterns run for every imported line
+_SANITIZE_RE = re.compile(r'[\\/*?:"<>|]')
+_ITEM_ID_RE = re.compile(r'/(?:en/)?items/(\d+)')
+
+# One pooled session for all scrapes and image downloads: keep-alive
+# skips the TCP+TLS handshake on every request after the first, and
+# transient server errors get a few retries with backoff
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+})
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504])
+)
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+
+# Concurrent image fetches per item; bounded so we don't slam the CDN
+IMAGE_WORKERS = 8
+
+# Image URLs fetched this run -> on-disk path; the same CDN asset reused
+# across items becomes a hardlink (or copy) instead of a second download
+_IMAGE_URL_CACHE = {}
+_IMAGE_URL_CACHE_LOCK = threading.Lock()
+
+# Items scraped in parallel during an import
+SCRAPE_WORKERS = 4
+
+# lxml parses several times faster than the pure-Python html.parser;
+# fall back gracefully when it isn't installed
+try:
+    import lxml  # noqa: F401
+    _SOUP_PARSER = 'lxml'
+except ImportError:
+    _SOUP_PARSER = 'html.parser'
+
+# orjson parses JSON several times faster than stdlib json; used for
+# reads only, so on-disk formatting never depends on whether it's
+# installed (which would defeat the skip-unchanged write check)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _load_json(path):
+    """Parse a JSON file, with orjson when available."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_filename(name):
     """Sanitize a string to be used as a safe filename."""
-    return re.sub(r'[\\/*?:"<>|]', "", name.replace(" ", "_"))
+    return _SANITIZE_RE.sub("", name.replace(" ", "_"))
 
+@functools.lru_cache(maxsize=4096)
 def extract_item_id(url):
     """Extracts the item ID from a Booth URL (handles both /items/<id> and /en/items/<id> patterns)."""
-    match = re.search(r'/(?:en/)?items/(\d+)', url)
+    match = _ITEM_ID_RE.search(url)
     return match.group(1) if match else "UnknownID"
 
 def scrape_metadata(url):
@@ -28,20 +94,15 @@ def scrape_metadata(url):
     Scrapes metadata from a Booth item URL.
     Adjust the CSS selectors if Booth's page structure changes.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Connection': 'keep-alive',
-    }
-    response = requests.get(url, headers=headers)
+    response = _SESSION.get(url, timeout=(5, 30))
     if response.status_code != 200:
         raise Exception(f"Failed to load page: {url} (Status code: {response.status_code})")
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    # Get title from meta tags first, then try page content
-    title_el = soup.select_one("meta[property='og:title']") or \
-               soup.select_one("title")
+    # Pass bytes so the parser handles encoding detection itself
+    soup = BeautifulSoup(response.content, _SOUP_PARSER)
+
+    # Get title from meta tags first, then try page content (find() with
+    # attribute filters is cheaper than re-parsing a CSS selector)
+    title_el = soup.find("meta", property="og:title") or soup.find("title")
     if title_el:
         title = title_el.get("content", "") or title_el.get_text(strip=True)
         # Remove " - BOOTH" suffix if present
@@ -50,7 +111,7 @@ def scrape_metadata(url):
         title = "Untitled"
 
     # Get description from meta tags first, then try page content
-    desc_el = soup.select_one("meta[property='og:description']") or \
+    desc_el = soup.find("meta", property="og:description") or \
               soup.select_one("div.js-market-item-detail-description p.autolink")
     description = desc_el.get("content", "") if desc_el else ""
     
@@ -58,7 +119,7 @@ def scrape_metadata(url):
     image_elements = []
     
     # Try meta image first
-    meta_image = soup.select_one("meta[property='og:image']")
+    meta_image = soup.find("meta", property="og:image")
     if meta_image and meta_image.get("content"):
         image_elements.append({"src": meta_image.get("content")})
     
@@ -80,6 +141,36 @@ def scrape_metadata(url):
     }
     return metadata
 
+def _download_one_image(img_url, local_path):
+    """Stream a single image to disk. Returns True on success."""
+    with _IMAGE_URL_CACHE_LOCK:
+        cached_path = _IMAGE_URL_CACHE.get(img_url)
+    if cached_path and os.path.exists(cached_path):
+        try:
+            try:
+                os.link(cached_path, local_path)
+            except OSError:
+                shutil.copyfile(cached_path, local_path)
+            return True
+        except Exception as e:
+            print(f"Error reusing cached image {img_url}: {e}")
+    try:
+        print(f"Downloading image {img_url}...")
+        with _SESSION.get(img_url, stream=True, timeout=(5, 60)) as r:
+            if r.status_code == 200:
+                # Stream to disk in chunks instead of buffering the
+                # whole image in memory
+                with open(local_path, "wb") as f:
+                    for chunk in r.iter_content(65536):
+                        f.write(chunk)
+                with _IMAGE_URL_CACHE_LOCK:
+                    _IMAGE_URL_CACHE[img_url] = local_path
+                return True
+            print(f"Failed to download image: {img_url} (status {r.status_code})")
+    except Exception as e:
+        print(f"Error downloading image {img_url}: {e}")
+    return False
+
 def download_images(metadata, folder_path, force_update=False):
     """
     Downloads images from the metadata's "images" list into an "images" subfolder
@@ -87,7 +178,8 @@ def download_images(metadata, folder_path, force_update=False):
     """
     images_dir = os.path.join(folder_path, "images")
     os.makedirs(images_dir, exist_ok=True)
-    local_image_paths = []
+    local_by_index = {}
+    pending = []
     for i, img_url in enumerate(metadata.get("images", [])):
         # Determine file extension from URL; default to .jpg if none found.
         ext = os.path.splitext(img_url)[1]
@@ -97,22 +189,38 @@ def download_images(metadata, folder_path, force_update=False):
         local_path = os.path.join(images_dir, filename)
         # If not forced and file exists, skip download.
         if not force_update and os.path.exists(local_path):
-            local_image_paths.append(local_path)
+            local_by_index[i] = local_path
             continue
-        try:
-            print(f"Downloading image {img_url}...")
-            r = requests.get(img_url)
-            if r.status_code == 200:
-                with open(local_path, "wb") as f:
-                    f.write(r.content)
-                local_image_paths.append(local_path)
-            else:
-                print(f"Failed to download image: {img_url} (status {r.status_code})")
-        except Exception as e:
-            print(f"Error downloading image {img_url}: {e}")
-    metadata["local_images"] = local_image_paths
+        pending.append((i, img_url, local_path))
+
+    if pending:
+        # The images are independent GETs against the same CDN, so fetch
+        # them concurrently over the shared pooled session
+        with ThreadPoolExecutor(max_workers=min(IMAGE_WORKERS, len(pending))) as pool:
+            results = pool.map(lambda t: _download_one_image(t[1], t[2]), pending)
+            for (i, _img_url, local_path), ok in zip(pending, results):
+                if ok:
+                    local_by_index[i] = local_path
+
+    # Page order is preserved regardless of download completion order
+    metadata["local_images"] = [local_by_index[i] for i in sorted(local_by_index)]
     return metadata
 
+def _write_json_if_changed(path, obj):
+    """Atomically write obj as JSON, skipping the write when the file
+    already holds identical bytes."""
+    data = json.dumps(obj, indent=4, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
 def ensure_item_folder(metadata, force_update=False):
     """
     Ensures that a folder exists for the given item.
@@ -136,21 +244,23 @@ def ensure_item_folder(metadata, force_update=False):
             new_metadata = scrape_metadata(metadata["url"])
             # Download images as part of the metadata
             new_metadata = download_images(new_metadata, folder_path, force_update=force_update)
-            with open(meta_file, "w", encoding="utf-8") as f:
-                json.dump(new_metadata, f, indent=4, ensure_ascii=False, sort_keys=True)
+            _write_json_if_changed(meta_file, new_metadata)
             return new_metadata, folder_path
         except Exception as e:
             print(f"Error scraping metadata for {metadata['url']}: {e}")
             return metadata, folder_path
     else:
         # Load existing metadata from the file.
-        with open(meta_file, "r", encoding="utf-8") as f:
-            existing_metadata = json.load(f)
-        # If images haven't been downloaded yet, download them.
-        if force_update or "local_images" not in existing_metadata:
+        existing_metadata = _load_json(meta_file)
+        # If images haven't been downloaded yet — or some stored local paths
+        # have gone stale — (re)download them. download_images rebuilds
+        # local_images from the files actually on disk, so consumers can
+        # trust the stored list without per-image existence checks.
+        local_images = existing_metadata.get("local_images", [])
+        missing = any(not os.path.exists(p) for p in local_images)
+        if force_update or "local_images" not in existing_metadata or missing:
             existing_metadata = download_images(existing_metadata, folder_path, force_update=force_update)
-            with open(meta_file, "w", encoding="utf-8") as f:
-                json.dump(existing_metadata, f, indent=2, ensure_ascii=False)
+            _write_json_if_changed(meta_file, existing_metadata)
         return existing_metadata, folder_path
 
 def parse_input_file(file_path):
@@ -172,12 +282,16 @@ def parse_input_file(file_path):
             if not reader.fieldnames:
                 print("CSV file appears to be empty.")
                 return items
+            # Resolve the case-insensitive column names once from the
+            # header instead of lowering every key of every row
+            field_map = {name.lower(): name for name in reader.fieldnames}
+            url_key = field_map.get("url")
+            id_key = field_map.get("id")
+            title_key = field_map.get("title")
             for row in reader:
-                # Convert all keys to lower-case for case-insensitivity
-                row_lower = {key.lower(): value for key, value in row.items()}
-                url = row_lower.get("url", "").strip()
-                item_id = row_lower.get("id", "").strip()
-                title = row_lower.get("title", "").strip()
+                url = (row.get(url_key) or "").strip() if url_key else ""
+                item_id = (row.get(id_key) or "").strip() if id_key else ""
+                title = (row.get(title_key) or "").strip() if title_key else ""
                 if url:
                     items.append({"url": url, "title": title})
                 elif item_id:
@@ -186,27 +300,26 @@ def parse_input_file(file_path):
                 else:
                     print("Skipping row, no URL or ID found.")
     elif ext == ".json":
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                json_data = json.load(f)
-                if isinstance(json_data, list):
-                    for obj in json_data:
-                        # Convert keys to lower-case for case-insensitivity
-                        obj_lower = {key.lower(): value for key, value in obj.items()}
-                        url = obj_lower.get("url", "").strip()
-                        item_id = str(obj_lower.get("id", "")).strip()
-                        title = obj_lower.get("title", "").strip()
-                        if url:
-                            items.append({"url": url, "title": title})
-                        elif item_id:
-                            constructed_url = f"https://booth.pm/items/{item_id}"
-                            items.append({"url": constructed_url, "title": title})
-                        else:
-                            print("Skipping object, no URL or ID found.")
-                else:
-                    print("JSON file is not a list, expecting a list of objects.")
-            except Exception as e:
-                print(f"Error reading JSON file: {e}")
+        try:
+            json_data = _load_json(file_path)
+            if isinstance(json_data, list):
+                for obj in json_data:
+                    # Convert keys to lower-case for case-insensitivity
+                    obj_lower = {key.lower(): value for key, value in obj.items()}
+                    url = obj_lower.get("url", "").strip()
+                    item_id = str(obj_lower.get("id", "")).strip()
+                    title = obj_lower.get("title", "").strip()
+                    if url:
+                        items.append({"url": url, "title": title})
+                    elif item_id:
+                        constructed_url = f"https://booth.pm/items/{item_id}"
+                        items.append({"url": constructed_url, "title": title})
+                    else:
+                        print("Skipping object, no URL or ID found.")
+            else:
+                print("JSON file is not a list, expecting a list of objects.")
+        except Exception as e:
+            print(f"Error reading JSON file: {e}")
     else:
         # Assume plain text file: one URL or item ID per line.
         with open(file_path, "r", encoding="utf-8") as f:
@@ -229,36 +342,67 @@ def add_items(input_file, force_update):
     if not items:
         print("No valid items found in input file.")
         return
-    
+    add_items_from_list(items, force_update)
+
+def add_items_from_list(items, force_update=False):
+    """Imports the given items (dicts with at least a 'url' key) directly.
+
+    Callers that already hold URLs in memory can use this instead of
+    writing them to a temp file just for add_items to re-parse.
+    """
+    # An input file can repeat the same item; scrape each one only once
+    # (first occurrence wins)
+    seen = set()
+    unique_items = []
+    for item in items:
+        item_id = extract_item_id(item["url"])
+        if item_id not in seen:
+            seen.add(item_id)
+            unique_items.append(item)
+    items = unique_items
+
     db = Database()
     os.makedirs(BASE_DIR, exist_ok=True)
-    
-    for item in items:
-        try:
-            metadata, folder_path = ensure_item_folder(item, force_update=force_update)
-            # Prepare image data as tuples of (url, local_path)
-            images = list(zip(metadata["images"], metadata.get("local_images", [])))
-            
-            # Add to database
-            db.add_item(
-                item_id=metadata["item_id"],
-                title=metadata["title"],
-                url=metadata["url"],
-                description=metadata.get("description", ""),
-                folder_path=folder_path,
-                images=images
-            )
-            print(f"Added/updated item {metadata['item_id']} in database.")
-            
-            # Create VCC package if enabled
-            if settings.is_vcc_enabled() and settings.get_auto_package_new_items():
-                try:
-                    if package_item(metadata, settings.get_repository_path(), db):
-                        print(f"Created VCC package for item {metadata['item_id']}.")
-                except Exception as e:
-                    print(f"Failed to create VCC package for item {metadata['item_id']}: {e}")
-        except Exception as e:
-            print(f"Failed to process item {item.get('url')}: {e}")
+
+    # Scraping and image downloads are network-bound, so overlap items
+    # across a small pool; database writes and packaging happen on this
+    # thread as each item completes, all inside one transaction so the
+    # import pays a single commit/fsync instead of one per item
+    with db.transaction(), \
+         ThreadPoolExecutor(max_workers=min(SCRAPE_WORKERS, len(items))) as pool:
+        futures = {
+            pool.submit(ensure_item_folder, item, force_update): item
+            for item in items
+        }
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                metadata, folder_path = future.result()
+                # Prepare image data as tuples of (url, local_path)
+                images = list(zip(metadata["images"], metadata.get("local_images", [])))
+
+                # Add to database
+                db.add_item(
+                    item_id=metadata["item_id"],
+                    title=metadata["title"],
+                    url=metadata["url"],
+                    description=metadata.get("description", ""),
+                    folder_path=folder_path,
+                    images=images
+                )
+                print(f"Added/updated item {metadata['item_id']} in database.")
+
+                # Create VCC package if enabled (the index is regenerated
+                # once for the whole import below)
+                if settings.is_vcc_enabled() and settings.get_auto_package_new_items():
+                    try:
+                        if package_item(metadata, settings.get_repository_path(), db,
+                                        regenerate_index=False):
+                            print(f"Created VCC package for item {metadata['item_id']}.")
+                    except Exception as e:
+                        print(f"Failed to create VCC package for item {metadata['item_id']}: {e}")
+            except Exception as e:
+                print(f"Failed to process item {item.get('url')}: {e}")
     
     # Regenerate repository index if VCC integration is enabled and any items were added
     if settings.is_vcc_enabled() and settings.get_auto_package_new_items() and len(items) > 0:
@@ -2,6 +2,7 @@
 import os
 import json
 import platform
+from contextlib import contextmanager
 
 class Settings:
     """
@@ -10,7 +11,11 @@ class Settings:
     """
     def __init__(self):
         self.config_path = self._get_config_path()
+        # Defaults are computed once; the getters fall back to this dict
+        # instead of re-running the platform/path logic per call
+        self._defaults = self._default_config()
         self.config = self._load_config()
+        self._autosave = True
     
     def _get_config_path(self):
         """Get the path to the configuration file based on the platform."""
@@ -32,8 +37,8 @@ class Settings:
                     return json.load(f)
             except (json.JSONDecodeError, IOError):
                 print(f"Error loading config from {self.config_path}, using defaults")
-                return self._default_config()
-        return self._default_config()
+                return dict(self._defaults)
+        return dict(self._defaults)
     
     def _default_config(self):
         """Create default configuration."""
@@ -53,19 +58,56 @@ class Settings:
             "repository_author": "booth-assets-manager@example.com"
         }
     
+    @contextmanager
+    def batch(self):
+        """Suspend the per-setter saves; write once when the block exits."""
+        self._autosave = False
+        try:
+            yield self
+        finally:
+            self._autosave = True
+            self.save()
+
     def save(self):
-        """Save current configuration to file."""
+        """Save current configuration to file (atomically, via a temp file).
+
+        Skips the write entirely when the file already holds identical
+        bytes, and returns immediately inside a batch() block.
+        """
+        if not self._autosave:
+            return True
+        data = json.dumps(self.config, indent=2, ensure_ascii=False).encode("utf-8")
         try:
-            with open(self.config_path, "w", encoding="utf-8") as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            with open(self.config_path, "rb") as f:
+                if f.read() == data:
+                    return True
+        except OSError:
+            pass
+        tmp_path = self.config_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.config_path)
             return True
         except IOError as e:
             print(f"Error saving config to {self.config_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
             return False
     
+    def get(self, key, default=None):
+        """Get a configuration value by key."""
+        return self.config.get(key, default)
+
+    def set(self, key, value):
+        """Set a configuration value (call save() to persist)."""
+        self.config[key] = value
+
     def get_repository_path(self):
         """Get the repository path from config or default."""
-        return self.config.get("repository_path", self._default_config()["repository_path"])
+        return self.config.get("repository_path", self._defaults["repository_path"])
     
     def is_vcc_enabled(self):
         """Check if VCC integration is enabled."""
@@ -87,7 +129,7 @@ class Settings:
     
     def get_repository_name(self):
         """Get the repository name."""
-        return self.config.get("repository_name", self._default_config()["repository_name"])
+        return self.config.get("repository_name", self._defaults["repository_name"])
     
     def set_repository_name(self, name):
         """Set the repository name."""
@@ -96,7 +138,7 @@ class Settings:
     
     def get_repository_id(self):
         """Get the repository ID."""
-        return self.config.get("repository_id", self._default_config()["repository_id"])
+        return self.config.get("repository_id", self._defaults["repository_id"])
     
     def set_repository_id(self, repo_id):
         """Set the repository ID."""
@@ -105,7 +147,7 @@ class Settings:
     
     def get_repository_author(self):
         """Get the repository author."""
-        return self.config.get("repository_author", self._default_config()["repository_author"])
+        return self.config.get("repository_author", self._defaults["repository_author"])
     
     def set_repository_author(self, author):
         """Set the repository author."""
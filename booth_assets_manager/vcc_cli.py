@@ -2,56 +2,40 @@
 import argparse
 import os
 import sys
-from .database import Database
 from .settings import settings
-from .vcc_integration import (
-    package_item,
-    unpackage_item,
-    package_all_items,
-    generate_repository_index,
-    open_vcc_integration,
-    validate_repository,
-    test_vcc_integration
-)
 
-def vcc_cli():
-    """Command-line interface for VCC repository management."""
-    parser = argparse.ArgumentParser(
-        description="Manage VCC repository for Booth Assets Manager"
-    )
-    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
-    
-    # Enable command
-    enable_parser = subparsers.add_parser("enable", help="Enable VCC integration")
-    
-    # Disable command
-    disable_parser = subparsers.add_parser("disable", help="Disable VCC integration")
-    
-    # Package command
+# Database (SQLAlchemy) and vcc_integration are imported inside the command
+# branches that need them so `--help`, `enable`, `disable`, and `settings`
+# don't pay the full startup cost.
+
+def _add_package_parser(subparsers):
     package_parser = subparsers.add_parser("package", help="Package an item")
     package_parser.add_argument("item_id", help="ID of the item to package")
-    
-    # Unpackage command
+
+def _add_unpackage_parser(subparsers):
     unpackage_parser = subparsers.add_parser("unpackage", help="Remove a package")
     unpackage_parser.add_argument("item_id", help="ID of the item to unpackage")
-    
-    # Package all command
+
+def _add_package_all_parser(subparsers):
     package_all_parser = subparsers.add_parser("package-all", help="Package all items")
-    
-    # Regenerate command
+    package_all_parser.add_argument("--workers", type=int, default=None,
+                                    help="Number of packaging threads (default: 4)")
+
+def _add_regenerate_parser(subparsers):
     regenerate_parser = subparsers.add_parser("regenerate", help="Regenerate repository index")
-    
-    # Add to VCC command
-    add_to_vcc_parser = subparsers.add_parser("add-to-vcc", help="Add repository to VCC")
-    
-    # Validate command
+    regenerate_parser.add_argument("--rebuild", action="store_true",
+                                   help="Rescan Packages/ on disk instead of using stored manifests")
+
+def _add_validate_parser(subparsers):
     validate_parser = subparsers.add_parser("validate", help="Validate repository structure")
     validate_parser.add_argument("--fix", action="store_true", help="Fix issues automatically")
-    
-    # Status command
+
+def _add_status_parser(subparsers):
     status_parser = subparsers.add_parser("status", help="Show repository status")
-    
-    # Settings command
+    status_parser.add_argument("--json", action="store_true",
+                               help="Emit machine-readable status on one line")
+
+def _add_settings_parser(subparsers):
     settings_parser = subparsers.add_parser("settings", help="Show or update settings")
     settings_parser.add_argument("--repository-path", help="Set repository path")
     settings_parser.add_argument("--repository-name", help="Set repository name")
@@ -59,13 +43,47 @@ def vcc_cli():
     settings_parser.add_argument("--repository-author", help="Set repository author")
     settings_parser.add_argument("--auto-package", action="store_true", help="Enable auto-packaging of new items")
     settings_parser.add_argument("--no-auto-package", action="store_true", help="Disable auto-packaging of new items")
-    
+
+def _add_simple_parser(name, help_text):
+    def _add(subparsers):
+        subparsers.add_parser(name, help=help_text)
+    return _add
+
+# One builder per command, in the order they appear in --help.  Only the
+# builder for the requested command runs on a normal invocation.
+_SUBPARSER_BUILDERS = {
+    "enable": _add_simple_parser("enable", "Enable VCC integration"),
+    "disable": _add_simple_parser("disable", "Disable VCC integration"),
+    "package": _add_package_parser,
+    "unpackage": _add_unpackage_parser,
+    "package-all": _add_package_all_parser,
+    "regenerate": _add_regenerate_parser,
+    "add-to-vcc": _add_simple_parser("add-to-vcc", "Add repository to VCC"),
+    "validate": _add_validate_parser,
+    "status": _add_status_parser,
+    "settings": _add_settings_parser,
+}
+
+def vcc_cli():
+    """Command-line interface for VCC repository management."""
+    parser = argparse.ArgumentParser(
+        description="Manage VCC repository for Booth Assets Manager"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+
+    # Build only the subparser for the requested command; --help, a bare
+    # invocation, or an unknown command falls back to registering all of
+    # them so argparse can print the full command list.
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command in _SUBPARSER_BUILDERS:
+        _SUBPARSER_BUILDERS[command](subparsers)
+    else:
+        for builder in _SUBPARSER_BUILDERS.values():
+            builder(subparsers)
+
     # Parse arguments
     args = parser.parse_args()
-    
-    # Initialize database
-    db = Database()
-    
+
     # Execute command
     if args.command == "enable":
         settings.set_vcc_enabled(True)
@@ -76,6 +94,8 @@ def vcc_cli():
         repo_path = settings.get_repository_path()
         index_path = os.path.join(repo_path, "index.json")
         if not os.path.exists(index_path):
+            from .vcc_integration import generate_repository_index
+
             generate_repository_index(
                 repo_path,
                 settings.get_repository_name(),
@@ -92,13 +112,18 @@ def vcc_cli():
         if not settings.is_vcc_enabled():
             print("VCC integration is not enabled. Use 'vcc enable' first.")
             return 1
-        
+
+        from .database import Database
+        from .vcc_integration import package_item
+
+        db = Database()
         item = db.get_item(args.item_id)
         if not item:
             print(f"Item {args.item_id} not found in database.")
             return 1
-        
-        if package_item(item, settings.get_repository_path(), db):
+
+        repo_path = settings.get_repository_path()
+        if package_item(item, repo_path, db):
             print(f"Item {args.item_id} packaged successfully.")
         else:
             print(f"Failed to package item {args.item_id}.")
@@ -108,13 +133,18 @@ def vcc_cli():
         if not settings.is_vcc_enabled():
             print("VCC integration is not enabled. Use 'vcc enable' first.")
             return 1
-        
+
+        from .database import Database
+        from .vcc_integration import unpackage_item
+
+        db = Database()
         item = db.get_item(args.item_id)
         if not item:
             print(f"Item {args.item_id} not found in database.")
             return 1
-        
-        if unpackage_item(item, settings.get_repository_path(), db):
+
+        repo_path = settings.get_repository_path()
+        if unpackage_item(item, repo_path, db):
             print(f"Item {args.item_id} unpackaged successfully.")
         else:
             print(f"Failed to unpackage item {args.item_id}.")
@@ -124,40 +154,64 @@ def vcc_cli():
         if not settings.is_vcc_enabled():
             print("VCC integration is not enabled. Use 'vcc enable' first.")
             return 1
-        
-        count = package_all_items(settings.get_repository_path(), db)
+
+        from .database import Database
+        from .vcc_integration import package_all_items
+
+        db = Database()
+        count = package_all_items(settings.get_repository_path(), db, workers=args.workers)
         print(f"Packaged {count} items.")
     
     elif args.command == "regenerate":
         if not settings.is_vcc_enabled():
             print("VCC integration is not enabled. Use 'vcc enable' first.")
             return 1
-        
-        index_path = generate_repository_index(
-            settings.get_repository_path(),
-            settings.get_repository_name(),
-            settings.get_repository_id(),
-            settings.get_repository_author()
-        )
+
+        repo_path = settings.get_repository_path()
+        if args.rebuild:
+            from .vcc_integration import generate_repository_index
+
+            index_path = generate_repository_index(
+                repo_path,
+                settings.get_repository_name(),
+                settings.get_repository_id(),
+                settings.get_repository_author()
+            )
+        else:
+            from .database import Database
+            from .vcc_integration import generate_repository_index_from_db
+
+            index_path = generate_repository_index_from_db(
+                repo_path,
+                Database(),
+                settings.get_repository_name(),
+                settings.get_repository_id(),
+                settings.get_repository_author()
+            )
         print(f"Repository index regenerated at {index_path}")
     
     elif args.command == "add-to-vcc":
         if not settings.is_vcc_enabled():
             print("VCC integration is not enabled. Use 'vcc enable' first.")
             return 1
-        
-        if open_vcc_integration(settings.get_repository_path()):
+
+        from .vcc_integration import open_vcc_integration, _file_uri
+
+        repo_path = settings.get_repository_path()
+        if open_vcc_integration(repo_path):
             print("VCC integration link opened in browser.")
         else:
             print("Failed to open VCC integration link. Please add the repository manually.")
-            print(f"Repository path: file:///{os.path.abspath(os.path.join(settings.get_repository_path(), 'index.json')).replace(os.sep, '/')}")
+            print(f"Repository path: {_file_uri(os.path.join(repo_path, 'index.json'))}")
             return 1
     
     elif args.command == "validate":
         if not settings.is_vcc_enabled():
             print("VCC integration is not enabled. Use 'vcc enable' first.")
             return 1
-        
+
+        from .vcc_integration import validate_repository
+
         result = validate_repository(settings.get_repository_path())
         
         if result["valid"]:
@@ -178,21 +232,31 @@ def vcc_cli():
         if not settings.is_vcc_enabled():
             print("VCC integration is not enabled. Use 'vcc enable' first.")
             return 1
-        
+
+        from .database import Database
+        from .vcc_integration import test_vcc_integration
+
+        db = Database()
+
         # Get repository status
         repo_path = settings.get_repository_path()
         status = test_vcc_integration(repo_path)
-        
+        # COUNT(*) instead of loading every packaged row just to len() it
+        status["packaged_items"] = db.count_packaged_items()
+
+        if args.json:
+            import json
+
+            print(json.dumps(status))
+            return 0
+
         print(f"Repository Path: {repo_path}")
         print(f"Repository Exists: {'Yes' if status['repository_exists'] else 'No'}")
         print(f"Index Valid: {'Yes' if status['index_valid'] else 'No'}")
         print(f"Packages Found: {status['packages_found']}")
         print(f"VCC Protocol Works: {'Yes' if status['vcc_protocol_works'] else 'No'}")
         print(f"Overall Status: {status['overall_status']}")
-        
-        # Get packaged items count
-        packaged_items = db.get_packaged_items()
-        print(f"Packaged Items: {len(packaged_items)}")
+        print(f"Packaged Items: {status['packaged_items']}")
         
         # Show repository settings
         print("\nRepository Settings:")
@@ -1,25 +1,60 @@
 #!/usr/bin/env python3
+import functools
 import os
 import re
 import json
+import pathlib
 import shutil
-import urllib.parse
 import platform
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Thread-pool width for batch packaging; bounded by disk throughput
+PACKAGE_WORKERS = 4
+
+# Concurrent file copies within a single package
+COPY_WORKERS = 8
+
+# orjson encodes/decodes severalfold faster than the stdlib; fall back
+# transparently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dump_json_bytes(obj):
+    """Encode obj as pretty-printed UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+def _parse_json_bytes(data):
+    """Decode UTF-8 JSON bytes; raises ValueError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _file_uri(path):
+    """Build a properly encoded file:// URI for a local path."""
+    return pathlib.Path(path).absolute().as_uri()
+
+# Compiled once; package IDs must be ASCII alphanumeric
+_SANITIZE_ID_RE = re.compile(r'[^a-zA-Z0-9]')
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_id(text):
     """Convert text to a valid package ID component."""
     if not text:
         return "unknown"
-    
+
     # Remove non-alphanumeric chars, replace spaces with dots
-    sanitized = re.sub(r'[^a-zA-Z0-9]', '', text.replace(' ', '.'))
-    
+    sanitized = _SANITIZE_ID_RE.sub('', text.replace(' ', '.'))
+
     # Ensure it starts with a letter
     if not sanitized or not sanitized[0].isalpha():
         sanitized = 'a' + sanitized
-    
+
     return sanitized.lower()
 
 def generate_package_id(item):
@@ -55,58 +90,75 @@ def create_package_manifest(item, version="1.0.0"):
             "url": creator_url
         },
         "vpmDependencies": {},  # No dependencies for basic assets
-        "url": f"file:///{os.path.abspath(item['folder']).replace(os.sep, '/')}",
+        "url": _file_uri(item['folder']),
         "legacyFolders": {},
         "legacyFiles": {}
     }
     
     return manifest
 
+def _fast_copy(src, dst):
+    """Hardlink src into the package when possible; fall back to a real copy.
+
+    Organized assets are immutable, so a hardlink is an O(1), zero-space
+    stand-in for copying multi-hundred-MB files. Cross-device targets and
+    filesystems without hardlink support fall back to shutil.copy2.
+    """
+    try:
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
 def create_package_structure(item, repository_path):
     """Create a Unity package structure for a Booth item."""
     # Generate package ID
     package_id = generate_package_id(item)
     
-    # Create package directory
+    # Create the package directory and standard folders; making the leaf
+    # directories creates package_dir along the way
     package_dir = os.path.join(repository_path, "Packages", package_id)
-    os.makedirs(package_dir, exist_ok=True)
-    
-    # Create standard folders
     runtime_dir = os.path.join(package_dir, "Runtime")
     docs_dir = os.path.join(package_dir, "Documentation~")
     os.makedirs(runtime_dir, exist_ok=True)
     os.makedirs(docs_dir, exist_ok=True)
     
-    # Copy assets to Runtime folder
+    # Collect asset copies for the Runtime folder (directories are created
+    # serially here; the copies fan out below)
     item_folder = item["folder"]
+    copy_jobs = []
     for root, dirs, files in os.walk(item_folder):
         # Skip the images folder and metadata.json
         if os.path.basename(root) == "images" or root == item_folder:
             continue
-            
+
         # Create corresponding directory in Runtime
         rel_path = os.path.relpath(root, item_folder)
         target_dir = os.path.join(runtime_dir, rel_path)
         os.makedirs(target_dir, exist_ok=True)
-        
-        # Copy files
+
         for file in files:
             if file != "metadata.json":
-                src_file = os.path.join(root, file)
-                dst_file = os.path.join(target_dir, file)
-                shutil.copy2(src_file, dst_file)
-    
-    # Copy images to Documentation folder
+                copy_jobs.append((os.path.join(root, file), os.path.join(target_dir, file)))
+
+    # Copy images to Documentation folder (only created when there are any)
     images_dir = os.path.join(item_folder, "images")
     docs_images_dir = os.path.join(docs_dir, "images")
-    os.makedirs(docs_images_dir, exist_ok=True)
-    
+
     if os.path.exists(images_dir):
-        for img in os.listdir(images_dir):
-            src_img = os.path.join(images_dir, img)
-            dst_img = os.path.join(docs_images_dir, img)
-            if os.path.isfile(src_img):
-                shutil.copy2(src_img, dst_img)
+        os.makedirs(docs_images_dir, exist_ok=True)
+        with os.scandir(images_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    copy_jobs.append((entry.path, os.path.join(docs_images_dir, entry.name)))
+
+    # The copies are independent and I/O-bound, so overlap them
+    if len(copy_jobs) == 1:
+        _fast_copy(*copy_jobs[0])
+    elif copy_jobs:
+        with ThreadPoolExecutor(max_workers=min(COPY_WORKERS, len(copy_jobs))) as pool:
+            list(pool.map(lambda job: _fast_copy(*job), copy_jobs))
     
     # Create README.md
     readme_content = f"# {item.get('title', 'Booth Item')}\n\n"
@@ -118,10 +170,65 @@ def create_package_structure(item, repository_path):
     
     # Create package.json
     manifest = create_package_manifest(item)
-    with open(os.path.join(package_dir, "package.json"), "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
-    
-    return package_id, package_dir
+    with open(os.path.join(package_dir, "package.json"), "wb") as f:
+        f.write(_dump_json_bytes(manifest))
+
+    return package_id, package_dir, manifest
+
+# Last parsed index.json per repository, invalidated by mtime, so
+# back-to-back incremental updates skip the re-read entirely.
+_INDEX_CACHE = {}
+
+# Top-level fields index.json must carry to be usable
+_REQUIRED_INDEX_FIELDS = frozenset({"name", "id", "url", "author", "packages"})
+
+def _load_index(repository_path):
+    """Return the parsed index.json for a repository, or None if missing/corrupt."""
+    index_path = os.path.join(repository_path, "index.json")
+    try:
+        mtime = os.stat(index_path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _INDEX_CACHE.get(repository_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(index_path, "rb") as f:
+            repo_data = _parse_json_bytes(f.read())
+    except (OSError, ValueError):
+        return None
+    _INDEX_CACHE[repository_path] = (mtime, repo_data)
+    return repo_data
+
+def _write_index(repository_path, repo_data):
+    """Write index.json atomically (temp file + fsync + rename)."""
+    index_path = os.path.join(repository_path, "index.json")
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_dump_json_bytes(repo_data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index_path)
+    _INDEX_CACHE[repository_path] = (os.stat(index_path).st_mtime_ns, repo_data)
+    return index_path
+
+def update_repository_index(repository_path, package_id, manifest=None, remove=False):
+    """Apply a single package change to index.json without rescanning Packages/.
+
+    Falls back to generate_repository_index when no valid index exists yet.
+    """
+    repo_data = _load_index(repository_path)
+    if repo_data is None or not isinstance(repo_data.get("packages"), dict):
+        return generate_repository_index(repository_path)
+
+    if remove:
+        repo_data["packages"].pop(package_id, None)
+    else:
+        version = manifest.get("version", "1.0.0")
+        package = repo_data["packages"].setdefault(package_id, {"versions": {}})
+        package["versions"][version] = manifest
+
+    return _write_index(repository_path, repo_data)
 
 def generate_repository_index(repository_path, repo_name="Booth Assets Collection", repo_id="com.boothassetsmanager.repository", repo_author="booth-assets-manager@example.com"):
     """Generate the index.json file for the VCC repository."""
@@ -132,39 +239,71 @@ def generate_repository_index(repository_path, repo_name="Booth Assets Collectio
     repo_data = {
         "name": repo_name,
         "id": repo_id,
-        "url": f"file:///{os.path.abspath(index_path).replace(os.sep, '/')}",
+        "url": _file_uri(index_path),
         "author": repo_author,
         "packages": {}
     }
     
-    # Scan packages directory
+    # Scan packages directory; scandir's DirEntry caches the file type
+    # from the readdir result, avoiding a stat per package
     if os.path.exists(packages_dir):
-        for package_dir in os.listdir(packages_dir):
-            package_path = os.path.join(packages_dir, package_dir)
-            if os.path.isdir(package_path):
-                manifest_path = os.path.join(package_path, "package.json")
-                
-                if os.path.exists(manifest_path):
-                    with open(manifest_path, "r", encoding="utf-8") as f:
-                        try:
-                            manifest = json.load(f)
-                            package_id = manifest.get("name")
-                            version = manifest.get("version", "1.0.0")
-                            
-                            # Add to packages dictionary
-                            if package_id:
-                                if package_id not in repo_data["packages"]:
-                                    repo_data["packages"][package_id] = {"versions": {}}
-                                
-                                repo_data["packages"][package_id]["versions"][version] = manifest
-                        except json.JSONDecodeError:
-                            print(f"Error parsing manifest: {manifest_path}")
+        with os.scandir(packages_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                manifest_path = os.path.join(entry.path, "package.json")
+
+                try:
+                    with open(manifest_path, "rb") as f:
+                        manifest = _parse_json_bytes(f.read())
+                except FileNotFoundError:
+                    continue
+                except ValueError:
+                    print(f"Error parsing manifest: {manifest_path}")
+                    continue
+
+                package_id = manifest.get("name")
+                version = manifest.get("version", "1.0.0")
+
+                # Add to packages dictionary
+                if package_id:
+                    if package_id not in repo_data["packages"]:
+                        repo_data["packages"][package_id] = {"versions": {}}
+
+                    repo_data["packages"][package_id]["versions"][version] = manifest
     
     # Write index.json
-    with open(index_path, "w", encoding="utf-8") as f:
-        json.dump(repo_data, f, indent=2, ensure_ascii=False)
-    
-    return index_path
+    return _write_index(repository_path, repo_data)
+
+def generate_repository_index_from_db(repository_path, db, repo_name="Booth Assets Collection", repo_id="com.boothassetsmanager.repository", repo_author="booth-assets-manager@example.com"):
+    """Build index.json from the manifests stored in the database.
+
+    One query replaces the Packages/ walk and per-manifest JSON parses.
+    Falls back to the filesystem rescan when any packaged item predates
+    manifest storage.
+    """
+    manifests = db.get_package_manifests()
+    if manifests is None:
+        return generate_repository_index(repository_path, repo_name, repo_id, repo_author)
+
+    index_path = os.path.join(repository_path, "index.json")
+    repo_data = {
+        "name": repo_name,
+        "id": repo_id,
+        "url": _file_uri(index_path),
+        "author": repo_author,
+        "packages": {}
+    }
+
+    for manifest in manifests:
+        package_id = manifest.get("name")
+        if not package_id:
+            continue
+        version = manifest.get("version", "1.0.0")
+        package = repo_data["packages"].setdefault(package_id, {"versions": {}})
+        package["versions"][version] = manifest
+
+    return _write_index(repository_path, repo_data)
 
 def get_vcc_protocol_url(repository_path):
     """Generate a VCC protocol URL to add the repository."""
@@ -172,52 +311,72 @@ def get_vcc_protocol_url(repository_path):
     if not os.path.exists(index_path):
         raise FileNotFoundError(f"Repository index not found at {index_path}")
     
-    # Format the file URL properly
-    file_url = f"file:///{os.path.abspath(index_path).replace(os.sep, '/')}"
-    encoded_url = urllib.parse.quote(file_url, safe=':/')
-    
-    return f"vcc://vpm/addRepo?url={encoded_url}"
+    # as_uri() already percent-encodes everything unsafe for a URL
+    return f"vcc://vpm/addRepo?url={_file_uri(index_path)}"
+
+def _resolve_opener():
+    """Pick the platform's URL/file opener once at import."""
+    system = platform.system()
+    if system == "Windows":
+        return os.startfile
+    command = "open" if system == "Darwin" else "xdg-open"
+    # Fire and forget: xdg-open can block for seconds waiting on the
+    # desktop environment, so spawn it detached and return immediately
+    return lambda target: subprocess.Popen(
+        [command, target],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+_OPEN_TARGET = _resolve_opener()
 
 def open_vcc_integration(repository_path):
     """Open the VCC protocol URL in the default browser."""
     try:
         vcc_url = get_vcc_protocol_url(repository_path)
-        
+
         # Open URL in default browser
-        if platform.system() == "Windows":
-            os.startfile(vcc_url)
-        elif platform.system() == "Darwin":  # macOS
-            subprocess.run(["open", vcc_url], check=True)
-        else:  # Linux
-            subprocess.run(["xdg-open", vcc_url], check=True)
-        
+        _OPEN_TARGET(vcc_url)
+
         return True
     except Exception as e:
         print(f"Error opening VCC integration: {e}")
         return False
 
-def package_item(item, repository_path, db):
-    """Package a single item."""
-    if not item:
-        print("Invalid item data.")
-        return False
-    
+def _package_item_manifest(item, repository_path, db):
+    """Package one item, returning (package_id, manifest) or None on failure."""
     try:
         # Create package structure
-        package_id, package_dir = create_package_structure(item, repository_path)
-        
-        # Update database
-        db.update_package_info(item["item_id"], package_id, "1.0.0")
-        
-        # Regenerate repository index
-        generate_repository_index(repository_path)
-        
+        package_id, package_dir, manifest = create_package_structure(item, repository_path)
+
+        # Update database, storing the manifest so index rebuilds can skip
+        # re-reading it from disk
+        db.update_package_info(item["item_id"], package_id, "1.0.0", manifest=manifest)
+
         print(f"Created package for {item['title']} ({item['item_id']}).")
-        return True
+        return package_id, manifest
     except Exception as e:
         print(f"Error packaging item {item['item_id']}: {e}")
+        return None
+
+def package_item(item, repository_path, db, regenerate_index=True):
+    """Package a single item."""
+    if not item:
+        print("Invalid item data.")
+        return False
+
+    packaged = _package_item_manifest(item, repository_path, db)
+    if packaged is None:
         return False
 
+    # Splice the new manifest into the existing index instead of
+    # rescanning Packages/ (batch callers update the index once at the end)
+    if regenerate_index:
+        update_repository_index(repository_path, *packaged)
+
+    return True
+
 def unpackage_item(item, repository_path, db):
     """Remove a package for an item."""
     if not item:
@@ -236,9 +395,9 @@ def unpackage_item(item, repository_path, db):
         
         # Update database
         db.update_package_info(item["item_id"], None, None, False)
-        
-        # Regenerate repository index
-        generate_repository_index(repository_path)
+
+        # Drop the package from the index without rescanning Packages/
+        update_repository_index(repository_path, item["package_id"], remove=True)
         
         print(f"Removed package for {item['title']} ({item['item_id']}).")
         return True
@@ -246,29 +405,79 @@ def unpackage_item(item, repository_path, db):
         print(f"Error removing package for item {item['item_id']}: {e}")
         return False
 
-def package_all_items(repository_path, db):
+def _write_index_from_manifests(repository_path, packaged):
+    """Splice a batch of freshly created manifests into the index in one write."""
+    repo_data = _load_index(repository_path)
+    if repo_data is None or not isinstance(repo_data.get("packages"), dict):
+        # No usable index yet; the full rescan picks the batch up anyway
+        return generate_repository_index(repository_path)
+
+    for package_id, manifest in packaged:
+        version = manifest.get("version", "1.0.0")
+        package = repo_data["packages"].setdefault(package_id, {"versions": {}})
+        package["versions"][version] = manifest
+
+    return _write_index(repository_path, repo_data)
+
+def package_all_items(repository_path, db, workers=None):
     """Package all items in the database."""
-    items = db.get_all_items()
-    packaged_count = 0
-    
-    for item in items:
-        if not item.get("is_packaged"):
-            if package_item(item, repository_path, db):
-                packaged_count += 1
-    
-    if packaged_count > 0:
-        generate_repository_index(repository_path)
-        print(f"Packaged {packaged_count} items and updated repository index.")
+    unpackaged = [item for item in db.get_all_items() if not item.get("is_packaged")]
+    packaged = []
+
+    if unpackaged:
+        # Packaging is mostly file copying (the GIL is released during
+        # I/O), so a small thread pool overlaps the disk work. The
+        # manifests come back in memory, so the index is written once
+        # below without re-reading a single package.json.
+        max_workers = min(workers or PACKAGE_WORKERS, len(unpackaged))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                (item, pool.submit(create_package_structure, item, repository_path))
+                for item in unpackaged
+            ]
+            # Sessions aren't thread-safe, so the workers only copy files;
+            # the row updates all land here in a single transaction
+            # instead of one commit (and fsync) per item
+            with db.transaction():
+                for item, future in futures:
+                    try:
+                        package_id, package_dir, manifest = future.result()
+                    except Exception as e:
+                        print(f"Error packaging item {item['item_id']}: {e}")
+                        continue
+                    db.update_package_info(item["item_id"], package_id, "1.0.0", manifest=manifest)
+                    packaged.append((package_id, manifest))
+                    print(f"Created package for {item['title']} ({item['item_id']}).")
+
+    if packaged:
+        _write_index_from_manifests(repository_path, packaged)
+        print(f"Packaged {len(packaged)} items and updated repository index.")
     else:
         print("No new items were packaged.")
-    
-    return packaged_count
+
+    return len(packaged)
+
+# Last clean validation per repository, keyed by index.json and Packages/
+# mtimes, so polling callers pay two stats instead of a revalidation
+_VALIDATE_CACHE = {}
 
 def validate_repository(repository_path):
     """Validate the repository structure and fix common issues."""
+    index_path = os.path.join(repository_path, "index.json")
+    packages_dir = os.path.join(repository_path, "Packages")
+
+    try:
+        cache_key = (os.stat(index_path).st_mtime_ns, os.stat(packages_dir).st_mtime_ns)
+    except OSError:
+        cache_key = None
+    if cache_key is not None:
+        cached = _VALIDATE_CACHE.get(repository_path)
+        if cached and cached[0] == cache_key:
+            return cached[1]
+
     issues = []
     fixes = []
-    
+
     # Check repository directory
     if not os.path.exists(repository_path):
         issues.append(f"Repository directory does not exist: {repository_path}")
@@ -279,7 +488,6 @@ def validate_repository(repository_path):
             issues.append(f"Failed to create repository directory: {e}")
     
     # Check Packages directory
-    packages_dir = os.path.join(repository_path, "Packages")
     if not os.path.exists(packages_dir):
         issues.append(f"Packages directory does not exist: {packages_dir}")
         try:
@@ -289,7 +497,6 @@ def validate_repository(repository_path):
             issues.append(f"Failed to create Packages directory: {e}")
     
     # Check index.json
-    index_path = os.path.join(repository_path, "index.json")
     if not os.path.exists(index_path):
         issues.append(f"Repository index does not exist: {index_path}")
         try:
@@ -298,37 +505,35 @@ def validate_repository(repository_path):
         except Exception as e:
             issues.append(f"Failed to generate repository index: {e}")
     else:
-        # Validate index.json format
-        try:
-            with open(index_path, "r", encoding="utf-8") as f:
-                index_data = json.load(f)
-                
-                # Check required fields
-                required_fields = ["name", "id", "url", "author", "packages"]
-                missing_fields = [field for field in required_fields if field not in index_data]
-                
-                if missing_fields:
-                    issues.append(f"Repository index missing required fields: {', '.join(missing_fields)}")
-                    try:
-                        generate_repository_index(repository_path)
-                        fixes.append(f"Regenerated repository index with required fields")
-                    except Exception as e:
-                        issues.append(f"Failed to regenerate repository index: {e}")
-        except json.JSONDecodeError:
+        # Validate index.json format (parsed once via the shared cache)
+        index_data = _load_index(repository_path)
+        if index_data is None:
             issues.append(f"Repository index is not valid JSON: {index_path}")
             try:
                 generate_repository_index(repository_path)
                 fixes.append(f"Regenerated repository index with valid JSON")
             except Exception as e:
                 issues.append(f"Failed to regenerate repository index: {e}")
-        except Exception as e:
-            issues.append(f"Error reading repository index: {e}")
-    
-    return {
+        else:
+            missing_fields = sorted(_REQUIRED_INDEX_FIELDS - index_data.keys())
+            if missing_fields:
+                issues.append(f"Repository index missing required fields: {', '.join(missing_fields)}")
+                try:
+                    generate_repository_index(repository_path)
+                    fixes.append(f"Regenerated repository index with required fields")
+                except Exception as e:
+                    issues.append(f"Failed to regenerate repository index: {e}")
+    
+    result = {
         "valid": len(issues) == 0 or len(fixes) == len(issues),
         "issues": issues,
         "fixes": fixes
     }
+    # Only a fully clean pass is cacheable; anything repaired changed the
+    # mtimes anyway, so the next call revalidates
+    if cache_key is not None and not issues:
+        _VALIDATE_CACHE[repository_path] = (cache_key, result)
+    return result
 
 def test_vcc_integration(repository_path):
     """Test the VCC integration and return status."""
@@ -344,18 +549,13 @@ def test_vcc_integration(repository_path):
     if os.path.exists(repository_path):
         results["repository_exists"] = True
         
-        # Check index.json
-        index_path = os.path.join(repository_path, "index.json")
-        if os.path.exists(index_path):
-            try:
-                with open(index_path, "r", encoding="utf-8") as f:
-                    index_data = json.load(f)
-                    if all(field in index_data for field in ["name", "id", "url", "packages"]):
-                        results["index_valid"] = True
-                        results["packages_found"] = sum(len(pkg.get("versions", {})) 
-                                                      for pkg in index_data.get("packages", {}).values())
-            except:
-                pass
+        # Check index.json (parsed once via the shared cache; "author" is
+        # optional here, matching the original check)
+        index_data = _load_index(repository_path)
+        if index_data is not None and (_REQUIRED_INDEX_FIELDS - {"author"}) <= index_data.keys():
+            results["index_valid"] = True
+            results["packages_found"] = sum(len(pkg.get("versions", {}))
+                                            for pkg in index_data.get("packages", {}).values())
         
         # Test VCC protocol
         try:
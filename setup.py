@@ -22,8 +22,11 @@ setup(
     install_requires=[
         'requests',
         'beautifulsoup4',
+        'lxml',
+        'orjson',
         'SQLAlchemy>=2.0.27',
         'playwright',
+        'aiohttp',
         'tqdm'
     ],
     entry_points={